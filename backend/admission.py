@@ -0,0 +1,115 @@
+"""
+추론 엔드포인트 승인 제어 (동시 추론 수 제한 + 대기열 + 지연 예산 초과 시 즉시 거절)
+
+- 동시에 추론 중인 요청은 최대 max_concurrent건, 나머지는 최대 max_queue건까지 이벤트 루프에서 대기
+  (스레드풀에 들어가기 전에 막으므로 과부하 때도 스레드풀 대기열이 무한히 길어지지 않는다)
+- 대기열이 가득 찼거나, 예상 대기 시간(앞선 대기 수 / 동시 수 × 최근 평균 처리 시간)이
+  budget_ms를 넘으면 바로 Overloaded. 대기하다 budget_ms가 지나도 Overloaded
+- shed=False로 요청하면(스트리밍 청크 등) 거절하지 않고 차례가 올 때까지 기다린다
+- 예상 대기 시간의 평균 처리 시간은 release(service_seconds)로 알려준 요청(/predict 단건)만 반영
+- 이벤트 루프 안에서만 호출하므로 잠금 없이 카운터를 갱신한다
+"""
+import asyncio
+import math
+from collections import deque
+from typing import Optional
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent: int, max_queue: int = 0, budget_ms: float = 1000.0, alpha: float = 0.2):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queue = max(0, int(max_queue))
+        self.budget = max(0.0, float(budget_ms)) / 1000.0
+        self.alpha = alpha
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self.service_seconds: Optional[float] = None  # 처리 시간 지수 이동 평균
+        self.admitted = 0
+        self.queued_total = 0
+        self.max_queued_seen = 0
+        self.shed = {"queue_full": 0, "budget": 0, "timeout": 0}
+        self.degraded = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, ahead: int) -> float:
+        """앞에 ahead건이 대기 중일 때 예상 대기 시간(초)"""
+        return (ahead + 1) / self.max_concurrent * (self.service_seconds or 0.0)
+
+    def _reject(self, reason: str, ahead: int) -> Overloaded:
+        self.shed[reason] += 1
+        return Overloaded(reason, max(1, math.ceil(self.expected_wait(ahead))))
+
+    async def acquire(self, shed: bool = True) -> None:
+        """추론 슬롯 1개 확보 (대기 포함). 확보하지 못하면 Overloaded. shed=False면 거절 없이 기다림."""
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        ahead = len(self._waiters)
+        if shed and ahead >= self.max_queue:
+            raise self._reject("queue_full", ahead)
+        if shed and self.expected_wait(ahead) > self.budget:
+            raise self._reject("budget", ahead)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self.queued_total += 1
+        self.max_queued_seen = max(self.max_queued_seen, len(self._waiters))
+        try:
+            await asyncio.wait([fut], timeout=self.budget if shed else None)
+        except asyncio.CancelledError:  # 클라이언트 연결 종료 등
+            self._abandon(fut)
+            raise
+        if not fut.done():
+            self._abandon(fut)
+            raise self._reject("timeout", len(self._waiters))
+        self.admitted += 1  # release()가 슬롯을 그대로 넘겨줌 (in_flight 유지)
+
+    def _abandon(self, fut: asyncio.Future) -> None:
+        if fut.done() and not fut.cancelled():
+            self.release()  # 이미 넘겨받은 슬롯은 돌려준다
+            return
+        fut.cancel()
+        try:
+            self._waiters.remove(fut)
+        except ValueError:
+            pass
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        """슬롯 반환. service_seconds(처리 시간)를 주면 예상 대기 시간 계산에 반영."""
+        if service_seconds is not None:
+            prev = self.service_seconds
+            self.service_seconds = service_seconds if prev is None else prev + self.alpha * (service_seconds - prev)
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "budget_ms": self.budget * 1000.0,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued_seen": self.max_queued_seen,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "shed": dict(self.shed),
+            "shed_total": sum(self.shed.values()),
+            "degraded": self.degraded,
+            "avg_service_ms": round(self.service_seconds * 1000.0, 3) if self.service_seconds is not None else None,
+        }
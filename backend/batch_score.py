@@ -0,0 +1,220 @@
+"""
+오프라인 배치 채점 CLI (HTTP 없이 대량 미션 채점)
+
+입력 CSV/Parquet을 청크 단위로 읽어 프로세스 풀에서 scoring.score_columns로 벡터화 채점하고
+(클램프/무게 효과/페널티/임계값 판정은 API와 같은 코드), 입력 컬럼 뒤에
+success_raw, success_final, applied_penalty, is_success를 붙여 청크마다 바로 출력 파일에 쓴다.
+동시에 처리 중인 청크 수를 워커 수 × 2로 제한하므로 입력 크기와 관계없이 메모리가 일정하다.
+
+    python batch_score.py missions.csv scored.csv --model rf_success_model.pkl --chunk-size 100000 --workers 4
+
+입력 컬럼은 MissionInput 필드명(payload_tons, mission_type, ...) 또는 데이터셋 컬럼명
+(Payload Weight (tons), ...)을 쓸 수 있다. 없는 컬럼은 기본값, 제약을 어기는 행은 건너뛰고 개수를 보고한다.
+MissionInput 숫자 필드 컬럼은 출력에서 float로, CSV의 나머지 컬럼은 읽은 문자열 그대로 쓴다
+(청크마다 dtype 추론이 달라져 Parquet 스키마가 바뀌지 않도록).
+워커는 서버 모듈(level.py) 대신 부수 효과 없는 scoring.py와 model_store만 import하므로
+모델 감시/프리셋 풀/응답 곡면/난이도 보정 스레드가 뜨지 않는다.
+Parquet 입출력은 pyarrow가 설치되어 있어야 한다.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model_store import load_model
+from scoring import (MODEL_FEATURE_COLUMNS, NUMERIC_INPUT_FIELDS, columns_from_frame, input_source_column,
+                     read_range_source, score_columns, select_rows)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_COLUMNS = ["success_raw", "success_final", "applied_penalty", "is_success"]
+
+# 워커(또는 --workers 0이면 현재 프로세스)마다 1회 준비
+_model = None
+_ranges = None
+
+
+def load_scorer(model_path: str, engine: str = "sklearn", mmap: bool = False) -> None:
+    """모델과 feature 범위를 읽어 이 프로세스의 채점기로 준비 (범위 파일 기준 경로는 현재 디렉터리)"""
+    global _model, _ranges
+    _model = load_model(model_path, MODEL_FEATURE_COLUMNS, engine=engine, fast=False, mmap=mmap)
+    try:
+        _ranges, _ = read_range_source()
+    except Exception as e:
+        _ranges = {}
+        print(f"[WARN] Could not load feature ranges: {e} (default ranges used)")
+
+
+def _init_worker(model_path: str, engine: str, mmap: bool) -> None:
+    os.chdir(BACKEND_DIR)
+    load_scorer(model_path, engine, mmap)
+
+
+def score_chunk(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """청크 1개 채점 → (유효 행 + 결과 컬럼, 건너뛴 행 수)"""
+    cols, valid = columns_from_frame(chunk)
+    out = chunk.loc[valid].reset_index(drop=True)
+    for name in NUMERIC_INPUT_FIELDS:
+        source = input_source_column(name, out.columns)
+        if source is not None:
+            out[source] = pd.to_numeric(out[source], errors="coerce").astype(float)
+    if not valid.any():  # 빈 입력은 모델에 넘기지 않음 (sklearn은 0행 입력에서 ValueError)
+        for name in RESULT_COLUMNS:
+            out[name] = pd.Series(dtype=bool if name == "is_success" else float)
+        return out, len(chunk)
+    scored = score_columns(select_rows(cols, valid), _model, _ranges)
+    out["success_raw"] = np.round(scored["success_raw"], 4)
+    out["success_final"] = np.round(scored["success_final"], 4)
+    out["applied_penalty"] = np.round(scored["applied_penalty"], 4)
+    out["is_success"] = scored["is_success"]
+    return out, int((~valid).sum())
+
+
+# =========================
+# 입출력 (청크 단위)
+# =========================
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("[ERROR] Parquet input/output requires pyarrow (pip install pyarrow)")
+    return pq
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if _is_parquet(path):
+        pq = _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # 모든 컬럼을 문자열로 읽고 숫자 변환은 columns_from_frame/score_chunk에서 (청크 간 dtype 고정)
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=object)
+
+
+def _stable_schema(schema):
+    """
+    첫 청크 스키마를 이후 청크도 담을 수 있게 넓힘: 정수 → float64 (다음 청크에 결측이 있으면 pandas가 float로 읽음),
+    null(첫 청크에서 전부 비어 있던 컬럼) → string. 메타데이터(pandas 인덱스 정보)는 버린다.
+    """
+    import pyarrow as pa
+    fields = []
+    for field in schema:
+        if pa.types.is_integer(field.type):
+            field = field.with_type(pa.float64())
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+class ChunkWriter:
+    """청크를 받는 대로 CSV(append) 또는 Parquet(row group)으로 기록"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self._parquet = _is_parquet(path)
+        self._writer = None
+        self._file = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._parquet:
+            import pyarrow as pa
+            pq = _require_pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, _stable_schema(table.schema))
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            if self._file is None:
+                self._file = open(self.path, "w", newline="", encoding="utf-8")
+                df.to_csv(self._file, index=False)
+            else:
+                df.to_csv(self._file, index=False, header=False)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def run(input_path: str, output_path: str, model_path: str, chunk_size: int, workers: int,
+        max_in_flight: Optional[int] = None, engine: str = "sklearn", mmap: bool = False) -> dict:
+    t0 = time.perf_counter()
+    writer = ChunkWriter(output_path)
+    skipped = 0
+    chunks = 0
+
+    def record(result: Tuple[pd.DataFrame, int]) -> None:
+        nonlocal skipped, chunks
+        out, n_skipped = result
+        writer.write(out)
+        skipped += n_skipped
+        chunks += 1
+        if chunks % 10 == 0:
+            rate = writer.rows / (time.perf_counter() - t0)
+            print(f"[INFO] {chunks} chunks, {writer.rows} rows scored ({rate:,.0f} rows/s)")
+
+    try:
+        if workers <= 0:
+            load_scorer(model_path, engine, mmap)
+            for chunk in read_chunks(input_path, chunk_size):
+                record(score_chunk(chunk))
+        else:
+            # Pool.imap은 입력을 미리 전부 읽어 큐에 쌓으므로, 진행 중 청크 수를 직접 제한
+            limit = max_in_flight or workers * 2
+            with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(model_path, engine, mmap)) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.apply_async(score_chunk, (chunk,)))
+                    if len(pending) >= limit:
+                        record(pending.popleft().get())
+                while pending:
+                    record(pending.popleft().get())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - t0
+    return {"rows": writer.rows, "skipped": skipped, "chunks": chunks, "seconds": round(elapsed, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="미션 CSV/Parquet 오프라인 배치 채점")
+    parser.add_argument("input", help="입력 파일 (.csv / .parquet)")
+    parser.add_argument("output", help="출력 파일 (.csv / .parquet)")
+    parser.add_argument("--model", default=os.getenv("MODEL_PATH", "rf_success_model.pkl"))
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="청크당 행 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="채점 프로세스 수 (0이면 현재 프로세스에서 처리)")
+    parser.add_argument("--engine", default=os.getenv("INFERENCE_ENGINE", "sklearn").lower(),
+                        choices=("sklearn", "compiled"), help="추론 엔진 (기본: INFERENCE_ENGINE)")
+    parser.add_argument("--mmap", action="store_true", default=os.getenv("MODEL_MMAP", "0") == "1",
+                        help="포레스트 배열을 mmap 사이드카로 워커 간 공유 (기본: MODEL_MMAP)")
+    args = parser.parse_args()
+
+    input_path = os.path.abspath(args.input)
+    output_path = os.path.abspath(args.output)
+    model_path = os.path.abspath(args.model)
+    os.chdir(BACKEND_DIR)  # CSV_RANGE_PATH 등 범위 파일의 상대 경로 기준
+
+    summary = run(input_path, output_path, model_path, max(1, args.chunk_size), args.workers,
+                  engine=args.engine, mmap=args.mmap)
+    rate = summary["rows"] / summary["seconds"] if summary["seconds"] else 0.0
+    print(f"[INFO] Scored {summary['rows']} rows in {summary['seconds']}s ({rate:,.0f} rows/s), "
+          f"skipped {summary['skipped']} invalid rows -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+벤치마크 (level.py를 ASGI 앱 그대로 프로세스 안에서 호출)
+
+- startup: 새 프로세스에서 의존성 import / `import level`(모델 로드 포함) / 첫 요청 시간, 워커 1개 메모리(RSS)
+- latency: /predict(매번 다른 입력, 같은 입력 반복), /preset 순차 호출 지연 분포
+- throughput: 동시 요청 수별 /predict 처리량과 지연 분포
+
+모델은 bench_model.py의 대체 모델을 쓰고(--model로 변경 가능), 입력도 시드로 고정한다.
+level.py의 환경 변수(INFERENCE_ENGINE, PREDICT_CACHE_SIZE, MICROBATCH_MAX_SIZE 등)는 그대로 적용되며
+설정된 것은 모두 결과 JSON의 meta.env에 기록된다. 대체 모델은 생성 조건(시드/크기/범위)과 파일 해시가
+bench_model.pkl.json과 같을 때만 재사용하고, 아니면 다시 만든다.
+
+    python bench.py --out bench_results.json
+    INFERENCE_ENGINE=compiled python bench.py --out compiled.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# meta.env에 값 대신 설정 여부만 기록할 변수
+SECRET_ENV = ("ADMIN_TOKEN",)
+
+
+def level_env_knobs() -> List[str]:
+    """level.py(와 채점 핵심 scoring.py)가 읽는 환경 변수 이름 전체 (소스에서 추출 → 설정이 추가돼도 기록 목록이 뒤처지지 않음)"""
+    names = set()
+    for module in ("level.py", "scoring.py"):
+        with open(os.path.join(BACKEND_DIR, module), encoding="utf-8") as f:
+            names.update(re.findall(r'os\.getenv\("([A-Z0-9_]+)"', f.read()))
+    return sorted(names)
+
+
+def recorded_env() -> Dict[str, str]:
+    """meta.env: 설정된 level.py 환경 변수 (비밀 값은 "<set>")"""
+    return {k: "<set>" if k in SECRET_ENV else os.environ[k] for k in level_env_knobs() if k in os.environ}
+
+
+def rss_mb() -> float:
+    """현재 프로세스 RSS(MB). /proc이 없으면 최대 RSS로 대신함."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+    except ImportError:
+        return 0.0
+
+
+def summarize(samples: List[float]) -> dict:
+    """지연 시간 목록(초) → ms 단위 통계"""
+    import numpy as np
+    a = np.asarray(samples, dtype=float) * 1000.0
+    if a.size == 0:
+        return {"n": 0}
+    return {
+        "n": int(a.size),
+        "mean_ms": round(float(a.mean()), 4),
+        "min_ms": round(float(a.min()), 4),
+        "p50_ms": round(float(np.percentile(a, 50)), 4),
+        "p90_ms": round(float(np.percentile(a, 90)), 4),
+        "p99_ms": round(float(np.percentile(a, 99)), 4),
+        "max_ms": round(float(a.max()), 4),
+    }
+
+
+# =========================
+# startup (별도 프로세스)
+# =========================
+def startup_child() -> None:
+    """--startup-child: 새 인터프리터에서 import/첫 요청 시간과 RSS를 JSON 한 줄로 출력"""
+    t0 = time.perf_counter()
+    rss0 = rss_mb()
+    import numpy, pandas, sklearn, fastapi, joblib  # noqa: F401
+    t1 = time.perf_counter()
+    import level
+    t2 = time.perf_counter()
+    rss_loaded = rss_mb()
+
+    import httpx
+
+    async def first_requests():
+        transport = httpx.ASGITransport(app=level.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            s = time.perf_counter()
+            resp = await client.post("/predict", json=preset_mission(level, 0))
+            first = time.perf_counter() - s
+            resp.raise_for_status()
+            for seed in range(1, 201):
+                await client.get("/preset", params={"difficulty": "normal", "seed": seed})
+                await client.post("/predict", json=preset_mission(level, seed))
+            return first
+
+    first = asyncio.run(first_requests())
+    print(json.dumps({
+        "import_deps_s": round(t1 - t0, 4),
+        "import_level_s": round(t2 - t1, 4),
+        "model_load_s": round(level.active_model.load_seconds, 4) if level.active_model else None,
+        "first_predict_ms": round(first * 1000.0, 3),
+        "rss_start_mb": round(rss0, 1),
+        "rss_after_import_mb": round(rss_loaded, 1),
+        "rss_after_warmup_mb": round(rss_mb(), 1),
+    }))
+
+
+def measure_startup(model_path: str, runs: int) -> dict:
+    env = dict(os.environ, MODEL_PATH=model_path)
+    results = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--startup-child"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        wall = time.perf_counter() - t0
+        row = json.loads(proc.stdout.strip().splitlines()[-1])
+        row["process_wall_s"] = round(wall, 4)
+        results.append(row)
+    best = {k: min(r[k] for r in results) for k in results[0] if results[0][k] is not None}
+    return {"runs": results, "best": best}
+
+
+# =========================
+# latency / throughput (현재 프로세스)
+# =========================
+def preset_mission(level, seed: int, difficulty: str = "hard") -> dict:
+    m = level.random_preset(difficulty, seed)
+    m.pop("difficulty", None)
+    return m
+
+
+async def sequential(client, make_request, n: int) -> List[float]:
+    samples = []
+    for i in range(n):
+        s = time.perf_counter()
+        r = await make_request(client, i)
+        samples.append(time.perf_counter() - s)
+        r.raise_for_status()
+    return samples
+
+
+async def concurrent(client, make_request, n: int, concurrency: int) -> dict:
+    samples: List[float] = []
+    counter = iter(range(n))
+
+    async def worker():
+        for i in counter:
+            s = time.perf_counter()
+            r = await make_request(client, i)
+            samples.append(time.perf_counter() - s)
+            r.raise_for_status()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    return {"concurrency": concurrency, "requests": n, "wall_s": round(wall, 4),
+            "rps": round(n / wall, 2), "latency": summarize(samples)}
+
+
+async def run_in_process(level, args) -> dict:
+    import httpx
+
+    missions = [preset_mission(level, args.seed + i) for i in range(args.requests)]
+    fixed = missions[0]
+
+    async def predict_unique(client, i):
+        return await client.post("/predict", json=missions[i % len(missions)])
+
+    async def predict_repeat(client, i):
+        return await client.post("/predict", json=fixed)
+
+    async def preset(client, i):
+        return await client.get("/preset", params={"difficulty": ("easy", "normal", "hard")[i % 3],
+                                                  "seed": args.seed + i})
+
+    transport = httpx.ASGITransport(app=level.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await sequential(client, predict_unique, args.warmup)
+        await sequential(client, preset, args.warmup)
+
+        level.prediction_cache.clear()
+        latency = {
+            "predict_unique": summarize(await sequential(client, predict_unique, args.requests)),
+            "predict_repeat": summarize(await sequential(client, predict_repeat, args.requests)),
+            "preset": summarize(await sequential(client, preset, args.requests)),
+        }
+
+        throughput = []
+        for c in args.concurrency:
+            level.prediction_cache.clear()
+            throughput.append(await concurrent(client, predict_unique, args.requests, c))
+    return {"latency": latency, "throughput": throughput, "rss_after_mb": round(rss_mb(), 1)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="level.py 벤치마크 (결과 JSON 출력)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--model", default="", help="모델 경로 (비우면 대체 모델을 만들어 사용)")
+    parser.add_argument("--requests", type=int, default=1000, help="측정 항목별 요청 수")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", default="1,4,16,64", help="쉼표 구분 동시 요청 수")
+    parser.add_argument("--startup-runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0, help="요청 입력 시드")
+    parser.add_argument("--label", default="", help="결과에 남길 메모 (비교용)")
+    parser.add_argument("--startup-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    os.chdir(BACKEND_DIR)  # CSV_RANGE_PATH 등 상대 경로 기준
+    if args.startup_child:
+        startup_child()
+        return
+
+    model_path = args.model
+    stand_in = None
+    if not model_path:
+        from bench_model import ensure_stand_in_model
+        model_path = os.path.join(BACKEND_DIR, "bench_model.pkl")
+        stand_in = ensure_stand_in_model(model_path)
+        if stand_in["rebuilt"]:
+            print(f"[INFO] Stand-in model saved to {model_path} (sha256={stand_in['sha256'][:12]})")
+    model_path = os.path.abspath(model_path)
+    os.environ["MODEL_PATH"] = model_path
+
+    print("[INFO] Measuring startup ...")
+    startup = measure_startup(model_path, args.startup_runs)
+
+    import level
+    if level.active_model is None:
+        sys.exit(f"[ERROR] Model could not be loaded from {model_path}")
+    print("[INFO] Measuring latency / throughput ...")
+    measured = asyncio.run(run_in_process(level, args))
+
+    result: Dict[str, object] = {
+        "meta": {
+            "label": args.label,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "model": level.active_model.info(),
+            "stand_in_model": stand_in,
+            "env": recorded_env(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "startup": startup,
+        **measured,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    for name, stats in measured["latency"].items():
+        print(f"  {name:<15} p50={stats['p50_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms")
+    for row in measured["throughput"]:
+        print(f"  concurrency={row['concurrency']:<3} {row['rps']:.1f} req/s p99={row['latency']['p99_ms']:.3f}ms")
+    print(f"[INFO] Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
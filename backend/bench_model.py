@@ -0,0 +1,162 @@
+"""
+벤치마크용 대체 모델 (rf_success_model.pkl은 저장소에 포함되지 않음)
+
+CSV_numeric_min_max_summary.csv의 범위와 predict()의 features dict 구성을 그대로 따르는
+합성 데이터로 OneHotEncoder + RandomForestRegressor 파이프라인을 학습한다.
+시드가 같으면 항상 같은 모델 파일이 만들어지므로 실행 간 결과를 비교할 수 있다.
+
+    python bench_model.py --out bench_model.pkl
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+# level.py와 동일한 범주 값 / 모델 입력 컬럼 순서
+CATEGORIES = {
+    "Mission Type": ["Exploration", "Research", "Mining", "Colonization"],
+    "Target Type": ["Planet", "Moon", "Asteroid", "Exoplanet", "Star"],
+    "Launch Vehicle": ["Starship", "Falcon Heavy", "SLS", "Ariane 6"],
+}
+NUMERIC_COLUMNS = [
+    "Distance from Earth (light-years)",
+    "Mission Duration (years)",
+    "Scientific Yield (points)",
+    "Crew Size",
+    "Fuel Consumption (tons)",
+]
+TARGET_COLUMN = "Mission Success (%)"
+
+# CSV가 없을 때 쓰는 범위 (CSV_numeric_min_max_summary.csv 값)
+FALLBACK_RANGES = {
+    "Distance from Earth (light-years)": (0.35, 49.9),
+    "Mission Duration (years)": (1.4, 29.5),
+    "Scientific Yield (points)": (10.0, 99.8),
+    "Crew Size": (1.0, 99.0),
+    "Fuel Consumption (tons)": (18.06, 5018.6),
+    TARGET_COLUMN: (66.0, 100.0),
+}
+
+
+def read_ranges(csv_path: str) -> dict:
+    ranges = dict(FALLBACK_RANGES)
+    if not os.path.isfile(csv_path):
+        return ranges
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("feature") in ranges:
+                ranges[row["feature"]] = (float(row["min"]), float(row["max"]))
+    return ranges
+
+
+def synthetic_dataset(n_rows: int, seed: int, ranges: dict) -> pd.DataFrame:
+    """범위 안에서 균등 샘플 + 단조 관계 + 잡음으로 만든 성공률(%) 데이터"""
+    rng = np.random.default_rng(seed)
+    data = {c: rng.choice(values, n_rows) for c, values in CATEGORIES.items()}
+    for c in NUMERIC_COLUMNS:
+        lo, hi = ranges[c]
+        data[c] = rng.uniform(lo, hi, n_rows)
+    data["Crew Size"] = np.round(data["Crew Size"])
+    df = pd.DataFrame(data, columns=list(CATEGORIES) + NUMERIC_COLUMNS)
+
+    def unit(c):
+        lo, hi = ranges[c]
+        return (df[c].to_numpy() - lo) / (hi - lo)
+
+    score = (
+        0.35 * (1 - unit("Distance from Earth (light-years)"))
+        + 0.20 * (1 - unit("Mission Duration (years)"))
+        + 0.20 * unit("Scientific Yield (points)")
+        + 0.10 * (1 - np.abs(unit("Crew Size") - 0.3))
+        + 0.15 * (1 - unit("Fuel Consumption (tons)"))
+    )
+    score += np.select(
+        [df["Launch Vehicle"] == "Starship", df["Launch Vehicle"] == "Ariane 6"], [0.05, -0.05], 0.0,
+    )
+    score += np.where(df["Target Type"] == "Exoplanet", -0.08, 0.0)
+    lo, hi = ranges[TARGET_COLUMN]
+    df[TARGET_COLUMN] = np.clip(lo + (hi - lo) * score + rng.normal(0, 3.0, n_rows), lo, hi)
+    return df
+
+
+def build_stand_in_model(n_rows: int = 500, n_estimators: int = 100, seed: int = 42,
+                         csv_path: str = "CSV_numeric_min_max_summary.csv") -> Pipeline:
+    df = synthetic_dataset(n_rows, seed, read_ranges(csv_path))
+    pipe = Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("cat", OneHotEncoder(handle_unknown="ignore"), list(CATEGORIES)),
+            ("num", "passthrough", NUMERIC_COLUMNS),
+        ])),
+        ("model", RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=1)),
+    ])
+    pipe.fit(df[list(CATEGORIES) + NUMERIC_COLUMNS], df[TARGET_COLUMN])
+    return pipe
+
+
+def stand_in_params(n_rows: int = 500, n_estimators: int = 100, seed: int = 42,
+                    csv_path: str = "CSV_numeric_min_max_summary.csv") -> dict:
+    """모델 파일을 다시 써도 되는지 판단하는 생성 조건 (범위와 sklearn 버전 포함)"""
+    import sklearn
+    return {
+        "rows": n_rows,
+        "trees": n_estimators,
+        "seed": seed,
+        "ranges": {c: list(v) for c, v in read_ranges(csv_path).items()},
+        "sklearn": sklearn.__version__,
+    }
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def ensure_stand_in_model(path: str, n_rows: int = 500, n_estimators: int = 100, seed: int = 42,
+                          csv_path: str = "CSV_numeric_min_max_summary.csv", force: bool = False) -> dict:
+    """
+    path에 대체 모델을 준비하고 생성 조건을 반환. <path>.json에 기록된 조건과 파일 해시가
+    모두 같을 때만 기존 파일을 재사용하고, 아니면 다시 만든다 (실행 간 비교 가능하도록).
+    """
+    params = stand_in_params(n_rows, n_estimators, seed, csv_path)
+    meta_path = f"{path}.json"
+    if not force and os.path.isfile(path):
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("params") == params and meta.get("sha256") == file_sha256(path):
+                return {**params, "sha256": meta["sha256"], "rebuilt": False}
+        except (OSError, ValueError):
+            pass
+    joblib.dump(build_stand_in_model(n_rows, n_estimators, seed, csv_path), path)
+    digest = file_sha256(path)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "sha256": digest}, f)
+    return {**params, "sha256": digest, "rebuilt": True}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 대체 모델 생성")
+    parser.add_argument("--out", default="bench_model.pkl")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    ensure_stand_in_model(args.out, args.rows, args.trees, args.seed, force=True)
+    print(f"[INFO] Stand-in model saved to {args.out} (rows={args.rows}, trees={args.trees}, seed={args.seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+배열 기반 랜덤 포레스트 평가기 (INFERENCE_ENGINE=compiled)
+
+모델 로드 시 파이프라인 안의 트리 앙상블(RandomForestRegressor 등)을
+평탄한 NumPy 배열(feature, threshold, left, right, value)로 변환해 두고,
+배치 전체 × 모든 트리를 깊이(level) 단위로 한 번에 내려가며 평가한다.
+sklearn 트리와 동일하게 입력을 float32로 맞춘 뒤 `x <= threshold` 로 분기하므로
+pipe.predict와 부동소수 오차 범위 내에서 같은 값을 낸다.
+"""
+import json
+import os
+from typing import Optional
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+# 배치가 클 때 (트리 수 × 행 수) 인덱스 배열이 커지지 않도록 행을 나눠 평가
+ROW_CHUNK = 4096
+
+# save()/load()로 주고받는 배열 이름 (각각 <이름>.npy, np.load(mmap_mode="r")로 공유 가능)
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+class CompiledForest:
+    """트리 앙상블을 평탄한 배열로 보관하고 벡터화 순회로 평가"""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth: int, n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_estimator(cls, estimator) -> Optional["CompiledForest"]:
+        """학습된 트리 회귀 앙상블(단일 출력)에서 변환. 지원하지 않는 모델이면 None."""
+        trees = getattr(estimator, "estimators_", None)
+        if trees is None and hasattr(estimator, "tree_"):
+            trees = [estimator]
+        if not trees or getattr(estimator, "n_outputs_", 1) != 1:
+            return None
+        if not all(hasattr(t, "tree_") for t in trees):
+            return None
+        # 분류기(predict가 클래스 선택)나 부스팅은 평균 규칙이 달라 지원하지 않음
+        if hasattr(estimator, "classes_") or hasattr(estimator, "learning_rate"):
+            return None
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        max_depth, offset = 0, 0
+        for t in trees:
+            tree = t.tree_
+            n = tree.node_count
+            left = tree.children_left.astype(np.int64)
+            right = tree.children_right.astype(np.int64)
+            is_leaf = left == -1
+            node_ids = np.arange(n, dtype=np.int64)
+
+            # 리프는 자기 자신을 가리키게 해서 깊이가 다른 트리도 같은 횟수만큼 내려갈 수 있게 함
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, right) + offset)
+            values.append(tree.value[:, 0, 0].astype(float))
+            roots.append(offset)
+
+            max_depth = max(max_depth, int(tree.max_depth))
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            n_features=int(getattr(estimator, "n_features_in_", 0)),
+        )
+
+    def save(self, directory: str) -> None:
+        """배열을 .npy(비압축)로 저장. 여러 프로세스가 load(mmap=True)로 같은 페이지를 공유할 수 있다."""
+        os.makedirs(directory, exist_ok=True)
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(directory, "forest.json"), "w", encoding="utf-8") as f:
+            json.dump({"max_depth": self.max_depth, "n_features": self.n_features}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CompiledForest":
+        """save()로 저장한 배열을 읽음. mmap=True면 메모리 매핑(읽기 전용)."""
+        with open(os.path.join(directory, "forest.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in FOREST_ARRAYS
+        }
+        return cls(max_depth=int(meta["max_depth"]), n_features=int(meta["n_features"]), **arrays)
+
+    def leaf_indices(self, X: np.ndarray) -> np.ndarray:
+        """각 (트리, 행)이 도달한 리프의 전역 노드 번호. shape = (n_trees, n_rows)"""
+        # sklearn 트리는 float32 입력으로 분기 → 동일하게 맞춤
+        X = np.asarray(X, dtype=np.float32)
+        n = X.shape[0]
+        rows = np.arange(n)[None, :]
+        idx = np.repeat(self.roots[:, None], n, axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[idx]] <= self.threshold[idx]
+            idx = np.where(go_left, self.left[idx], self.right[idx])
+        return idx
+
+    def predict_per_tree(self, X: np.ndarray) -> np.ndarray:
+        """트리별 예측값. shape = (n_trees, n_rows)"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty((self.n_trees, X.shape[0]), dtype=float)
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            stop = start + ROW_CHUNK
+            out[:, start:stop] = self.value[self.leaf_indices(X[start:stop])]
+        return out
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """앙상블 예측 (트리 평균). pipe.predict와 같은 1차원 배열."""
+        return self.predict_per_tree(X).mean(axis=0)
+
+    def head(self, n_trees: int) -> "CompiledForest":
+        """앞쪽 n_trees개 트리만 쓰는 포레스트 (노드 배열이 트리 순서대로 이어져 있으므로 복사 없는 슬라이스)"""
+        n_trees = max(1, min(int(n_trees), self.n_trees))
+        if n_trees == self.n_trees:
+            return self
+        end = int(self.roots[n_trees])
+        return CompiledForest(
+            feature=self.feature[:end],
+            threshold=self.threshold[:end],
+            left=self.left[:end],
+            right=self.right[:end],
+            value=self.value[:end],
+            roots=self.roots[:n_trees],
+            max_depth=self.max_depth,
+            n_features=self.n_features,
+        )
+
+
+class CompiledPipeline:
+    """전처리는 sklearn 파이프라인 앞단, 트리 평가는 CompiledForest"""
+
+    def __init__(self, preprocess, forest: CompiledForest):
+        self.preprocess = preprocess
+        self.forest = forest
+
+    def transform(self, X) -> np.ndarray:
+        Xt = self.preprocess.transform(X) if self.preprocess is not None else X
+        if hasattr(Xt, "toarray"):  # OneHotEncoder 희소 출력
+            Xt = Xt.toarray()
+        return np.asarray(Xt, dtype=float)
+
+    def predict(self, X) -> np.ndarray:
+        return self.forest.predict(self.transform(X))
+
+    @property
+    def steps(self) -> list:
+        """fast_predict가 전처리기/추정기를 찾을 수 있도록 Pipeline과 같은 형태로 노출"""
+        pre = self.preprocess.steps if isinstance(self.preprocess, Pipeline) else (
+            [("preprocess", self.preprocess)] if self.preprocess is not None else [])
+        return pre + [("forest", self.forest)]
+
+
+def compile_pipeline(pipe, probe_rows: int = 256, seed: int = 0) -> Optional[CompiledPipeline]:
+    """
+    joblib으로 로드한 모델(Pipeline 또는 트리 앙상블 단독)을 CompiledPipeline으로 변환.
+    임의 입력으로 sklearn 추정기와 결과를 비교해 다르면 None(=sklearn 경로 유지).
+    """
+    if pipe is None:
+        return None
+    try:
+        if isinstance(pipe, Pipeline):
+            preprocess = pipe[:-1] if len(pipe.steps) > 1 else None
+            estimator = pipe.steps[-1][1]
+        else:
+            preprocess, estimator = None, pipe
+        forest = CompiledForest.from_estimator(estimator)
+        if forest is None:
+            print(f"[WARN] Compiled engine does not support {type(estimator).__name__}; using sklearn")
+            return None
+
+        # 검증: 각 feature의 분기 임계값 범위 안에서 임의 입력을 만들어 비교
+        rng = np.random.default_rng(seed)
+        split = forest.threshold != np.inf
+        n_features = forest.n_features or int(forest.feature.max()) + 1
+        X = np.zeros((probe_rows, n_features))
+        for j in range(n_features):
+            th = forest.threshold[split & (forest.feature == j)]
+            if th.size:
+                X[:, j] = rng.uniform(th.min() - 1.0, th.max() + 1.0, probe_rows)
+        expected = estimator.predict(X)
+        if not np.allclose(forest.predict(X), expected, rtol=1e-7, atol=1e-7):
+            print("[WARN] Compiled engine mismatch against sklearn; using sklearn")
+            return None
+        return CompiledPipeline(preprocess, forest)
+    except Exception as e:
+        print(f"[WARN] Could not compile model: {e}")
+        return None
@@ -0,0 +1,204 @@
+"""
+단일 행 고속 추론 경로 (pandas 미사용)
+
+모델 로드 시 1회, 학습된 sklearn 파이프라인(ColumnTransformer → 추정기)을 분석해
+- 입력 컬럼 → 출력 열 위치(원-핫 인코딩 포함)
+- 수치 변환(passthrough / StandardScaler)
+를 미리 계산해 둔다. 요청 시에는 스레드별로 미리 할당한 NumPy 행에 값을 채워
+추정기(estimator)에 바로 넘기므로 DataFrame 생성과 ColumnTransformer 비용이 없다.
+
+파이프라인 구조를 모르면 build_fast_predictor()가 None을 반환하고,
+호출 측은 기존 pd.DataFrame 경로를 그대로 사용한다.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+
+class FastRowPredictor:
+    """미리 계산된 인코딩 계획으로 feature dict 1건을 추정기에 바로 넣는 예측기"""
+
+    def __init__(
+        self,
+        estimator,
+        n_outputs: int,
+        numeric: List[Tuple[str, int, float, float]],
+        onehot: List[Tuple[str, Dict[object, int], bool]],
+    ):
+        self.estimator = estimator
+        self.n_outputs = n_outputs
+        self.numeric_names = [name for name, _, _, _ in numeric]
+        self.numeric_idx = np.array([idx for _, idx, _, _ in numeric], dtype=np.intp)
+        self.numeric_mean = np.array([mean for _, _, mean, _ in numeric], dtype=float)
+        self.numeric_scale = np.array([scale for _, _, _, scale in numeric], dtype=float)
+        self.onehot = onehot
+        self._local = threading.local()
+
+    def _row(self) -> np.ndarray:
+        # 스레드풀에서 동시에 호출되므로 버퍼는 스레드별로 1개씩 미리 할당
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.zeros((1, self.n_outputs), dtype=float)
+            self._local.row = row
+        return row
+
+    def encode(self, features: dict, out: np.ndarray) -> bool:
+        """features를 out(1차원, 길이 n_outputs)에 인코딩. 처리 못 하는 범주값이면 False."""
+        out.fill(0.0)
+        for name, mapping, ignore_unknown in self.onehot:
+            idx = mapping.get(features[name])
+            if idx is None:
+                if not ignore_unknown:
+                    return False  # handle_unknown="error" → 느린 경로에서 동일한 에러가 나도록
+                continue
+            out[idx] = 1.0
+        vals = np.fromiter((features[n] for n in self.numeric_names), dtype=float, count=len(self.numeric_names))
+        out[self.numeric_idx] = (vals - self.numeric_mean) / self.numeric_scale
+        return True
+
+    def encode_row(self, features: dict) -> Optional[np.ndarray]:
+        """스레드별 버퍼에 인코딩한 (1, n_outputs) 행. 인코딩할 수 없으면 None."""
+        row = self._row()
+        return row if self.encode(features, row[0]) else None
+
+    def output_owners(self, input_columns: Sequence[str]) -> np.ndarray:
+        """출력 열마다 그 열을 만든 입력 컬럼의 번호 (input_columns 기준, 해당 없음 = len(input_columns))"""
+        position = {c: i for i, c in enumerate(input_columns)}
+        owners = np.full(self.n_outputs, len(input_columns), dtype=np.intp)
+        for name, idx in zip(self.numeric_names, self.numeric_idx):
+            owners[idx] = position.get(name, len(input_columns))
+        for name, mapping, _ in self.onehot:
+            owners[list(mapping.values())] = position.get(name, len(input_columns))
+        return owners
+
+    def predict_one(self, features: dict) -> Optional[float]:
+        """단일 행 예측. 인코딩할 수 없으면 None(=호출 측에서 기존 경로 사용)."""
+        row = self.encode_row(features)
+        if row is None:
+            return None
+        return float(self.estimator.predict(row)[0])
+
+
+def _is_passthrough(trans) -> bool:
+    if isinstance(trans, str):
+        return trans == "passthrough"
+    # 학습 후 transformers_에는 "passthrough"가 항등 FunctionTransformer로 들어간다
+    return isinstance(trans, FunctionTransformer) and trans.func is None
+
+
+def _resolve_columns(ct: ColumnTransformer, cols, input_columns: Sequence[str]) -> Optional[List[str]]:
+    if isinstance(cols, str):
+        cols = [cols]
+    names = []
+    for c in list(cols):
+        if isinstance(c, (int, np.integer)):
+            if not hasattr(ct, "feature_names_in_"):
+                return None
+            c = ct.feature_names_in_[int(c)]
+        if not isinstance(c, str) or c not in input_columns:
+            return None
+        names.append(c)
+    return names
+
+
+def _plan_from_pipeline(pipe, input_columns: Sequence[str], estimator=None) -> Optional[FastRowPredictor]:
+    # sklearn Pipeline 또는 같은 steps 형태를 노출하는 객체(CompiledPipeline)
+    if not isinstance(getattr(pipe, "steps", None), list) or len(pipe.steps) != 2:
+        return None
+    ct, final = pipe.steps[0][1], pipe.steps[-1][1]
+    if not isinstance(ct, ColumnTransformer) or hasattr(final, "feature_names_in_"):
+        return None
+    estimator = final if estimator is None else estimator
+
+    numeric: List[Tuple[str, int, float, float]] = []
+    onehot: List[Tuple[str, Dict[object, int], bool]] = []
+    n_outputs = 0
+    for name, trans, cols in ct.transformers_:
+        if isinstance(trans, str) and trans == "drop":
+            continue
+        sl = ct.output_indices_[name]
+        n_outputs = max(n_outputs, sl.stop)
+        if sl.stop == sl.start:
+            continue
+        names = _resolve_columns(ct, cols, input_columns)
+        if names is None:
+            return None
+
+        if _is_passthrough(trans) or isinstance(trans, StandardScaler):
+            mean = getattr(trans, "mean_", None) if isinstance(trans, StandardScaler) else None
+            scale = getattr(trans, "scale_", None) if isinstance(trans, StandardScaler) else None
+            if sl.stop - sl.start != len(names):
+                return None
+            for k, col in enumerate(names):
+                numeric.append((
+                    col,
+                    sl.start + k,
+                    float(mean[k]) if mean is not None else 0.0,
+                    float(scale[k]) if scale is not None else 1.0,
+                ))
+        elif isinstance(trans, OneHotEncoder):
+            if getattr(trans, "drop_idx_", None) is not None or getattr(trans, "_infrequent_enabled", False):
+                return None
+            offset = sl.start
+            for col, cats in zip(names, trans.categories_):
+                onehot.append((col, {c: offset + k for k, c in enumerate(cats.tolist())},
+                               trans.handle_unknown != "error"))
+                offset += len(cats)
+            if offset != sl.stop:
+                return None
+        else:
+            return None
+
+    if n_outputs == 0:
+        return None
+    return FastRowPredictor(estimator, n_outputs, numeric, onehot)
+
+
+def _probe_rows(fast: FastRowPredictor, input_columns: Sequence[str], n_rows: int = 16,
+                seed: int = 0) -> List[Dict[str, object]]:
+    """검증용 입력 n_rows행: 수치 컬럼은 컬럼·행마다 다른 값(자릿수도 컬럼마다 다르게), 범주는 알려진 값을 돌아가며"""
+    rng = np.random.default_rng(seed)
+    categories = {name: list(mapping) for name, mapping, _ in fast.onehot}
+    rows = []
+    for r in range(n_rows):
+        row: Dict[str, object] = {}
+        for k, col in enumerate(input_columns):
+            if col in categories:
+                cats = categories[col]
+                row[col] = cats[(r + k) % len(cats)]
+            else:
+                row[col] = float(rng.uniform(0.0, 10.0 ** (1 + k % 4)))
+        rows.append(row)
+    return rows
+
+
+def build_fast_predictor(pipe, input_columns: Sequence[str], estimator=None) -> Optional[FastRowPredictor]:
+    """
+    파이프라인을 분석해 FastRowPredictor 생성.
+    estimator를 주면 파이프라인 마지막 단계 대신 사용(예: 배열 기반 포레스트 엔진).
+    구조를 모르거나, 검증용 입력(여러 행)에서 기존 경로와 결과가 다르면 None.
+    """
+    if pipe is None:
+        return None
+    try:
+        fast = _plan_from_pipeline(pipe, input_columns, estimator)
+        if fast is None:
+            return None
+
+        # 검증: 여러 행에서 기존 경로와 결과 비교. 수치 컬럼마다 서로 다른 값을 넣어야
+        # 컬럼이 뒤바뀌거나 스케일러 구간이 어긋난 인코딩 계획을 잡아낼 수 있다
+        probes = _probe_rows(fast, input_columns)
+        expected = np.asarray(pipe.predict(pd.DataFrame(probes, columns=list(input_columns))), dtype=float)
+        for probe, want in zip(probes, expected):
+            got = fast.predict_one(probe)
+            if got is None or not np.isclose(got, want, rtol=1e-7, atol=1e-7):
+                print("[WARN] Fast predict path disabled: mismatch against the pipeline on probe rows")
+                return None
+        return fast
+    except Exception as e:
+        print(f"[WARN] Fast predict path disabled: {e}")
+        return None
@@ -1,12 +1,36 @@
+import csv
+import hmac
+import json
 import os
 import random
+import threading
+import time
 import numpy as np
-import pandas as pd
-import joblib
-from typing import Dict, Tuple, Optional
-from fastapi import FastAPI, Query
+from typing import Dict, List, Tuple, Optional, Union
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+try:
+    import orjson
+except ImportError:  # 없으면 표준 json으로 같은 결과를 만든다 (느림)
+    orjson = None
+    print("[WARN] orjson is not installed; format=compact responses use the slower stdlib json encoder")
+from starlette.concurrency import run_in_threadpool
+
+from admission import AdmissionController, Overloaded
+from metrics import SHED_HEADER, MetricsMiddleware, MetricsRegistry
+from micro_batcher import MicroBatcher
+from model_registry import ModelRegistry, parse_pairs
+from model_store import LoadedModel, load_model
+from prediction_cache import PredictionCache, parse_quantization
+from preset_pool import PresetPool
+from range_profiler import quantile_table
+from response_surface import ResponseSurface, build_response_surface
+import scoring
+from scoring import (API2CSV, CATEGORICAL_INPUT_FIELDS, MODEL_FEATURE_COLUMNS, NUMERIC_INPUT_FIELDS,
+                     SUCCESS_THRESHOLD_PERCENT, MissionInput, apply_payload_effects, missions_to_columns,
+                     payload_penalty, range_source_path, read_range_source)
 
 # =========================
 # 0) 서버 & CORS
@@ -20,98 +44,159 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 계측: METRICS=0이면 미들웨어/단계별 타이머를 아예 붙이지 않음 (/metrics에는 캐시 등 통계만)
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+metrics = MetricsRegistry(prefix="space_mission")
+metrics.describe("requests_total", "HTTP requests by endpoint")
+metrics.describe("errors_total", "HTTP 5xx responses (except load-shed 503s) or unhandled exceptions by endpoint")
+metrics.describe("request_seconds", "End-to-end request latency including response serialization")
+metrics.describe("predict_stage_seconds", "/predict latency per stage")
+metrics.describe("model_not_loaded_total", "/predict calls answered without a loaded model")
+metrics.describe("model_request_seconds", "/predict and /predict/batch latency per model")
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics, route_paths=lambda: [r.path for r in app.routes])
+
 @app.get("/")
 def root():
     return {
         "service": "Space Mission Backend",
         "version": "1.2.0",
-        "endpoints": ["/health", "/preset", "/predict", "/docs"]
+        "compact_columns": COMPACT_COLUMNS + MODEL_FEATURE_COLUMNS,
+        "endpoints": ["/health", "/preset", "/presets", "/predict", "/predict/batch", "/predict/stream", "/predict/uncertainty", "/sweep", "/optimize", "/metrics", "/admin/reload", "/docs"]
     }
 
 # =========================
 # 1) 모델 로드
 # =========================
 MODEL_PATH = os.getenv("MODEL_PATH", "rf_success_model.pkl")
-try:
-    pipe = joblib.load(MODEL_PATH)
-    print(f"[INFO] Model loaded successfully from {MODEL_PATH}")
-except Exception as e:
-    pipe = None
-    print(f"[WARN] Could not load model from '{MODEL_PATH}': {e}")
+# 추론 엔진: "sklearn"(기본) | "compiled"(트리를 평탄한 배열로 변환해 벡터화 평가)
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn").lower()
+# 단일 행 고속 경로: 인코딩/컬럼 순서를 로드 시 1회 계산 (구조를 모르면 기존 경로)
+FAST_PREDICT = os.getenv("FAST_PREDICT", "1") != "0"
+# 포레스트 배열을 mmap 사이드카(<MODEL_PATH>.mmap/)로 두고 uvicorn 워커들이 페이지를 공유 (compiled 엔진 사용)
+MODEL_MMAP = os.getenv("MODEL_MMAP", "0") == "1"
+# 트리 경로 기여도(explain=true)용 노드별 값을 모델 로드/리로드 때 미리 계산 (기본 1: explain 비용 ≈ 예측 비용,
+# 리로드는 교체 전에 준비). sklearn 엔진에서도 포레스트 배열을 만들므로 explain을 쓰지 않고 워커 메모리를
+# 아껴야 하면 0 (첫 explain 요청이 변환 비용을 치르고, 그동안 다른 explain 요청은 기다린다)
+EXPLAIN_PRECOMPUTE = os.getenv("EXPLAIN_PRECOMPUTE", "1") != "0"
+# 과부하 저하 모드: 승인 제어에서 거절될 요청을 앞쪽 N개 트리 평균으로 응답 (0이면 503). 로드 시 준비
+DEGRADED_TREES = int(os.getenv("ADMISSION_DEGRADED_TREES", "0"))
+
+def load_active_model(path: str = MODEL_PATH) -> Optional[LoadedModel]:
+    """모델 로드 (실패 시 None). 엔진/고속 경로까지 준비된 LoadedModel 반환."""
+    try:
+        model = load_model(path, MODEL_FEATURE_COLUMNS, engine=INFERENCE_ENGINE, fast=FAST_PREDICT, mmap=MODEL_MMAP,
+                           explain=EXPLAIN_PRECOMPUTE)
+    except Exception as e:
+        print(f"[WARN] Could not load model from '{path}': {e}")
+        return None
+    if DEGRADED_TREES > 0:
+        t0 = time.perf_counter()
+        if model.subset_forest(DEGRADED_TREES) is None or model.fast is None:
+            print(f"[WARN] Degraded mode needs a tree ensemble with the fast path; "
+                  f"overloaded requests on '{path}' will get 503")
+        model.load_seconds += time.perf_counter() - t0
+    print(f"[INFO] Model loaded successfully from {path} in {model.load_seconds:.3f}s "
+          f"(version={model.version}, engine={model.engine}, storage={model.storage}, "
+          f"fast_path={model.fast is not None}, pid={os.getpid()})")
+    return model
+
+# 현재 서비스 중인 모델. 핫 리로드 시 이 참조만 통째로 교체(원자적)
+active_model: Optional[LoadedModel] = load_active_model()
+
+def predict_one(features: dict, timer=None) -> float:
+    """features dict 1건 예측 (현재 모델)"""
+    return active_model.predict_one(features, timer)
+
+# 예측 LRU 캐시 (키: 클램프·무게 효과까지 적용된 최종 features). 크기 0이면 비활성
+# PREDICT_CACHE_QUANT 예: "Fuel Consumption (tons)=1,Distance from Earth (light-years)=0.1"
+prediction_cache = PredictionCache(
+    MODEL_FEATURE_COLUMNS,
+    max_size=int(os.getenv("PREDICT_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.getenv("PREDICT_CACHE_TTL", "0")),
+    quantization=parse_quantization(os.getenv("PREDICT_CACHE_QUANT", "")),
+)
+
+def cached_predict_one(features: dict, timer=None) -> float:
+    """prediction_cache를 거치는 predict_one"""
+    if not prediction_cache.enabled:
+        return predict_one(features, timer)
+    key = prediction_cache.make_key(features)
+    raw = prediction_cache.get(key)
+    if timer:
+        timer.mark("cache")
+    if raw is None:
+        generation = prediction_cache.generation
+        raw = predict_one(features, timer)
+        prediction_cache.put(key, raw, generation)
+    return raw
+
+# 다중 모델: 기본 모델(active_model) 외 버전을 이름으로 등록해 요청 시 로드
+# (MODEL_RESIDENT_MAX: 기본 모델을 포함한 최대 상주 모델 수, 나머지는 LRU로 내보냄)
+# MODEL_REGISTRY 예: "candidate=rf_v2.pkl,legacy=rf_v0.pkl", MODEL_SPLIT 예: "default=90,candidate=10"
+DEFAULT_MODEL_NAME = "default"
+model_registry = ModelRegistry(
+    parse_pairs(os.getenv("MODEL_REGISTRY", "")),
+    loader=lambda path: load_active_model(path),
+    default_getter=lambda: active_model,
+    columns=MODEL_FEATURE_COLUMNS,
+    default_name=DEFAULT_MODEL_NAME,
+    max_resident=int(os.getenv("MODEL_RESIDENT_MAX", "2")),
+    split={k: float(v) for k, v in parse_pairs(os.getenv("MODEL_SPLIT", "")).items()},
+    shadow=os.getenv("MODEL_SHADOW", "") or None,
+)
+
+def resolve_model_name(name: Optional[str]) -> str:
+    """요청의 model 파라미터 → 등록된 이름 (생략 시 MODEL_SPLIT 가중치로 선택)"""
+    if name is None:
+        return model_registry.choose()
+    if name not in model_registry.names():
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}' (choose from {model_registry.names()})")
+    return name
 
-# ===== (1) 성공 임계값: 0~1 스케일, 기본 0.5 =====
-SUCCESS_THRESHOLD_PERCENT = float(os.getenv("SUCCESS_THRESHOLD_PERCENT", "50.0"))
+def registry_model(name: str) -> LoadedModel:
+    """기본 모델이 아닌 등록 모델 (로드 실패 시 503)"""
+    model = model_registry.get(name)
+    if model is None:
+        raise HTTPException(status_code=503, detail=f"Model '{name}' could not be loaded")
+    return model
 
 # =========================
 # 1-1) CSV 기반 feature 범위 로드 & 유틸
 # =========================
-CSV_RANGE_PATH = os.getenv("CSV_RANGE_PATH", "CSV_numeric_min_max_summary.csv")
+# 범위 파일 경로/RANGE_QUANTILES/읽기(read_range_source)는 scoring.py (배치 채점 CLI와 공유)
 FEATURE_RANGES: Dict[str, Tuple[float, float]] = {}  # {"feature_name": (min, max)}
+DATASET_PROFILE: Optional[dict] = None  # 프로파일에서 읽었을 때만 (분위수/범주 빈도 샘플링용)
 
-def load_feature_ranges(csv_path: str = CSV_RANGE_PATH) -> None:
-    """CSV에서 (feature, min, max) 읽어 FEATURE_RANGES에 저장"""
-    global FEATURE_RANGES
+def load_feature_ranges(path: Optional[str] = None) -> None:
+    """범위 파일에서 읽어 FEATURE_RANGES(와 DATASET_PROFILE)에 저장"""
+    global FEATURE_RANGES, DATASET_PROFILE
+    path = path or range_source_path()
     try:
-        df = pd.read_csv(csv_path)
-        ranges = {}
-        for _, r in df.iterrows():
-            f = str(r["feature"])
-            if f in IGNORED_CSV_FEATURES:
-                continue
-            fmin, fmax = float(r["min"]), float(r["max"])
-            if fmin > fmax:  # 방어
-                fmin, fmax = fmax, fmin
-            ranges[f] = (fmin, fmax)
-        FEATURE_RANGES = ranges
-        print(f"[INFO] Loaded feature ranges from {csv_path}: {len(FEATURE_RANGES)} items")
+        FEATURE_RANGES, DATASET_PROFILE = read_range_source(path)
+        print(f"[INFO] Loaded feature ranges from {path}: {len(FEATURE_RANGES)} items")
     except Exception as e:
-        FEATURE_RANGES = {}
-        print(f"[WARN] Could not load feature ranges from '{csv_path}': {e}")
-
-# === API 필드 ↔ CSV feature 이름 매핑 ===
-API2CSV = {
-    "payload_tons": "Payload Weight (tons)",
-    "distance_ly": "Distance from Earth (light-years)",
-    "duration_years": "Mission Duration (years)",
-    "science_pts": "Scientific Yield (points)",
-    "crew_size": "Crew Size",
-    "fuel_tons": "Fuel Consumption (tons)",
-}
-# CSV에 있지만 모델 입력에 쓰지 않는 컬럼(무시)
-IGNORED_CSV_FEATURES = {
-    "Mission Cost (billion USD)",
-    "Mission Success (%)",
-}
+        FEATURE_RANGES, DATASET_PROFILE = {}, None
+        print(f"[WARN] Could not load feature ranges from '{path}': {e}")
 
-# === CSV에 없을 때 사용할 기본 범위(폴백) ===
-DEFAULT_RANGES: Dict[str, Tuple[float, float]] = {
-    "Payload Weight (tons)": (5.0, 80.0),
-    "Distance from Earth (light-years)": (5.0, 200.0),
-    "Mission Duration (years)": (3.0, 20.0),
-    "Scientific Yield (points)": (20.0, 100.0),
-    "Crew Size": (4.0, 20.0),
-    "Fuel Consumption (tons)": (1000.0, 8000.0),
+# 범주 API 필드 ↔ 데이터셋 컬럼 (프로파일의 범주 빈도 조회용)
+CATEGORY2CSV = {
+    "mission_type": "Mission Type",
+    "target_type": "Target Type",
+    "launch_vehicle": "Launch Vehicle",
 }
 
-def get_range_by_csv_name(csv_name: str) -> Tuple[float, float]:
-    """CSV feature명으로 범위를 가져오되, 없으면 DEFAULT_RANGES로 폴백."""
-    if csv_name in FEATURE_RANGES:
-        lo, hi = FEATURE_RANGES[csv_name]
-        return (hi, lo) if lo > hi else (lo, hi)
-    if csv_name in DEFAULT_RANGES:
-        return DEFAULT_RANGES[csv_name]
-    raise KeyError(f"Missing range for CSV feature '{csv_name}'")
+def get_range_by_csv_name(csv_name: str, ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> Tuple[float, float]:
+    """CSV feature명으로 범위를 가져오되, 없으면 DEFAULT_RANGES로 폴백. ranges를 주면 FEATURE_RANGES 대신 사용."""
+    return scoring.get_range_by_csv_name(csv_name, FEATURE_RANGES if ranges is None else ranges)
 
-def get_range_by_api_name(api_name: str) -> Tuple[float, float]:
+def get_range_by_api_name(api_name: str, ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> Tuple[float, float]:
     """API 필드명으로 CSV 이름을 찾아서 범위를 반환."""
-    if api_name not in API2CSV:
-        raise KeyError(f"Unknown API feature '{api_name}' (no mapping to CSV)")
-    csv_name = API2CSV[api_name]
-    return get_range_by_csv_name(csv_name)
+    return scoring.get_range_by_api_name(api_name, FEATURE_RANGES if ranges is None else ranges)
 
-def clamp_by_api_name(api_name: str, value: float) -> float:
+def clamp_by_api_name(api_name: str, value: float, ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> float:
     try:
-        lo, hi = get_range_by_api_name(api_name)
+        lo, hi = get_range_by_api_name(api_name, ranges)
     except KeyError:
         return float(value)
     return float(np.clip(value, lo, hi))
@@ -140,6 +225,8 @@ load_feature_ranges()
 # === 난이도별 중첩 밴드: easy ⊂ normal ⊂ hard (API 이름을 받아서 CSV 범위를 내부에서 찾음) ===
 EASY_FRAC   = 0.25
 NORMAL_FRAC = 0.65
+# 난이도별 밴드 비율. 모델 기반 보정(CALIBRATE_DIFFICULTY=1)이 끝나면 통째로 교체됨
+DIFFICULTY_FRACS: Dict[str, float] = {"easy": EASY_FRAC, "normal": NORMAL_FRAC, "hard": 1.0}
 
 def nested_band_from_api(api_name: str, difficulty: str, invert: bool = False) -> Tuple[float, float]:
     """
@@ -153,8 +240,9 @@ def nested_band_from_api(api_name: str, difficulty: str, invert: bool = False) -
         return lo, hi
 
     span = hi - lo
-    ef = float(np.clip(EASY_FRAC, 0.0, 1.0))
-    nf = max(float(np.clip(NORMAL_FRAC, 0.0, 1.0)), ef)
+    fracs = DIFFICULTY_FRACS
+    ef = float(np.clip(fracs["easy"], 0.0, 1.0))
+    nf = max(float(np.clip(fracs["normal"], 0.0, 1.0)), ef)
 
     diff = (difficulty or "normal").lower()
     if diff not in ("easy", "normal", "hard"):
@@ -171,21 +259,38 @@ def rand_in_band(rng: np.random.Generator, lo: float, hi: float, decimals: Optio
     val = lo if lo == hi else rng.uniform(lo, hi)
     return float(round(val, decimals)) if decimals is not None else float(val)
 
+# 프리셋/난이도 보정 샘플링: "uniform"(기본, 밴드 안 균등) | "profile"(데이터셋 프로파일의 분포를 따름)
+PRESET_SAMPLING = os.getenv("PRESET_SAMPLING", "uniform").lower()
+
+def band_values(api_name: str, lo, hi, u) -> np.ndarray:
+    """
+    균등 난수 u ∈ [0, 1) → 밴드 [lo, hi] 안의 값 (배열 브로드캐스트).
+    PRESET_SAMPLING=profile이고 프로파일 분위수가 있으면 밴드로 자른 데이터 분포(분위수 보간)에서,
+    아니면 균등하게 뽑는다.
+    """
+    lo, hi, u = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float), np.asarray(u, dtype=float))
+    table = None
+    if PRESET_SAMPLING == "profile" and DATASET_PROFILE is not None:
+        table = quantile_table(DATASET_PROFILE, API2CSV[api_name])
+    if table is None:
+        return np.where(lo == hi, lo, lo + (hi - lo) * u)
+    probs, values = table
+    p_lo, p_hi = np.interp(lo, values, probs), np.interp(hi, values, probs)
+    return np.clip(np.interp(p_lo + (p_hi - p_lo) * u, probs, values), lo, hi)
+
+def category_weights(api_name: str, choices: List[str]) -> Optional[List[float]]:
+    """PRESET_SAMPLING=profile일 때 choices별 데이터셋 빈도 비율 (없거나 전부 0이면 None = 균등)"""
+    if PRESET_SAMPLING != "profile" or DATASET_PROFILE is None:
+        return None
+    freq = DATASET_PROFILE.get("categorical", {}).get(CATEGORY2CSV[api_name], {}).get("frequencies", {})
+    counts = [float(freq.get(c, 0)) for c in choices]
+    total = sum(counts)
+    return [c / total for c in counts] if total > 0 else None
+
 # =========================
 # 2) 데이터 스키마 정의
 # =========================
-class MissionInput(BaseModel):
-    payload_tons: float = Field(ge=0, description="실을 무게(톤). 모델 입력에는 직접 쓰지 않음, 페널티 계산용.")
-    mission_type: str = Field(default="Exploration")
-    target_type: str = Field(default="Planet")
-    launch_vehicle: str = Field(default="Starship")
-    distance_ly: float = Field(default=45.0, ge=0)
-    duration_years: float = Field(default=12.0, ge=0)
-    science_pts: float = Field(default=60.0, ge=0)
-    crew_size: int = Field(default=10, ge=1)
-    fuel_tons: float = Field(default=3000.0, ge=0)
-    clamp_min: float = Field(default=0.0)
-    clamp_max: float = Field(default=100.0)
+# 입력 스키마 MissionInput은 scoring.py
 
 # ===== (2) 응답 스키마에 is_success 추가 =====
 class PredictionOut(BaseModel):
@@ -195,15 +300,50 @@ class PredictionOut(BaseModel):
     features_used: dict
     is_success: bool  # ✅ 추가
 
+class ExplanationOut(BaseModel):
+    bias: float                      # 트리 루트 값 평균 (학습 데이터 평균 성공률)
+    contributions: Dict[str, float]  # features_used 키별 기여도, bias + 합계 = success_raw
+    payload_penalty: float           # success_raw에서 빼는 무게 페널티 (= applied_penalty)
+    clamp_adjustment: float          # clamp_min/clamp_max 클립으로 바뀐 양
+
+class ExplainedPredictionOut(PredictionOut):
+    explanation: ExplanationOut
+
+# ===== compact 응답 (?format=compact): 키 없는 고정 순서 배열, response_model 검증 생략 =====
+# 행 = [success_raw, success_final, applied_penalty, is_success] (+ features=true면 MODEL_FEATURE_COLUMNS 순서 값)
+COMPACT_COLUMNS = ["success_raw", "success_final", "applied_penalty", "is_success"]
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class CompactJSONResponse(Response):
+    """pydantic 검증/jsonable_encoder를 거치지 않고 바로 직렬화 (orjson이 있으면 NumPy 배열도 그대로)"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(content, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+def is_compact_format(fmt: str) -> bool:
+    fmt = fmt.lower()
+    if fmt not in ("full", "compact"):
+        raise HTTPException(status_code=422, detail="format must be 'full' or 'compact'")
+    return fmt == "compact"
+
+def predict_mode(mode: str) -> str:
+    mode = mode.lower()
+    if mode not in ("exact", "approx"):
+        raise HTTPException(status_code=422, detail="mode must be 'exact' or 'approx'")
+    return mode
+
 # =========================
-# 3) 무게 간접 영향 반영
+# 3) 무게 간접 영향 반영: scoring.apply_payload_effects / payload_penalty
 # =========================
-def apply_payload_effects(payload_tons: float, duration_years: float, science_pts: float, fuel_tons: float):
-    """payload가 클수록 기간↑, 연료소모↑, 과학효율↓"""
-    duration_adj = duration_years + 0.10 * payload_tons
-    fuel_adj = fuel_tons + 2.0 * payload_tons
-    science_adj = max(0.0, science_pts - 0.30 * payload_tons)
-    return duration_adj, science_adj, fuel_adj
 
 # =========================
 # 4) 헬스체크
@@ -212,35 +352,95 @@ def apply_payload_effects(payload_tons: float, duration_years: float, science_pt
 def health():
     return {
         "status": "ok",
-        "model_loaded": pipe is not None,
+        "model_loaded": active_model is not None,
+        "inference_engine": active_model.engine if active_model is not None else None,
+        "model": active_model.info() if active_model is not None else None,
+        "last_reload": LAST_RELOAD,
         "ranges_loaded": len(FEATURE_RANGES) > 0,
+        "dataset_profile": DATASET_PROFILE.get("source") if DATASET_PROFILE is not None else None,
         "success_threshold_percent": SUCCESS_THRESHOLD_PERCENT,  # ✅ (4) 임계값 노출(디버깅 편의)
+        "prediction_cache": prediction_cache.stats(),
+        "micro_batcher": micro_batcher.stats() if micro_batcher is not None else {"enabled": False},
+        "response_surface": response_surface.info() if response_surface is not None else None,
+        "difficulty_bands": {"fracs": DIFFICULTY_FRACS, "calibration": DIFFICULTY_CALIBRATION},
+        "model_registry": model_registry.stats(),
+        "preset_pool": preset_pool.stats() if preset_pool is not None else {"enabled": False},
+        "admission": admission.stats() if admission is not None else {"enabled": False},
     }
 
+# =========================
+# 4-1) /metrics (Prometheus text format)
+# =========================
+def _runtime_metrics():
+    """요청 경로 밖에서 읽어오는 통계 (캐시, micro-batcher, 모델 상태)"""
+    yield ("metrics_enabled", "gauge", "1 if per-request instrumentation is on", {}, int(METRICS_ENABLED))
+    yield ("model_loaded", "gauge", "1 if a model is loaded", {}, int(active_model is not None))
+    cache = prediction_cache.stats()
+    yield ("prediction_cache_hits_total", "counter", "Prediction cache hits", {}, cache["hits"])
+    yield ("prediction_cache_misses_total", "counter", "Prediction cache misses", {}, cache["misses"])
+    yield ("prediction_cache_evictions_total", "counter", "Prediction cache LRU evictions", {}, cache["evictions"])
+    yield ("prediction_cache_size", "gauge", "Prediction cache entries", {}, cache["size"])
+    if micro_batcher is not None:
+        mb = micro_batcher.stats()
+        yield ("micro_batches_total", "counter", "Micro-batches dispatched", {}, mb["batches"])
+        yield ("micro_batch_items_total", "counter", "Requests served through micro-batches", {}, mb["items"])
+    if admission is not None:
+        adm = admission.stats()
+        yield ("admission_in_flight", "gauge", "/predict requests currently running inference", {}, adm["in_flight"])
+        yield ("admission_queued", "gauge", "/predict requests waiting for an inference slot", {}, adm["queued"])
+        for reason, count in adm["shed"].items():
+            yield ("admission_shed_total", "counter", "/predict requests rejected by admission control",
+                   {"reason": reason}, count)
+        yield ("admission_degraded_total", "counter", "Rejected /predict requests answered in degraded mode", {},
+               adm["degraded"])
+    registry = model_registry.stats()
+    for name, stats in registry["per_model"].items():
+        yield ("model_requests_total", "counter", "Prediction requests per model", {"model": name}, stats["requests"])
+        yield ("model_rows_total", "counter", "Rows scored per model", {"model": name}, stats["rows"])
+        yield ("model_errors_total", "counter", "Failed prediction requests per model", {"model": name}, stats["errors"])
+        yield ("model_resident", "gauge", "1 if the model is loaded in memory", {"model": name},
+               int(name in registry["resident"]))
+        if "shadow" in stats:
+            yield ("shadow_mean_abs_diff", "gauge", "Mean |shadow - primary| success_raw", {"model": name},
+                   stats["shadow"]["mean_abs_diff"])
+    yield ("shadow_dropped_total", "counter", "Shadow batches dropped because the queue was full", {},
+           registry["shadow_dropped"])
+
+metrics.add_collector(_runtime_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # =========================
 # 5) 미션 성공률 예측 (CSV 범위로 최종 클램프 보장)
 # =========================
-@app.post("/predict", response_model=PredictionOut)
-def predict(m: MissionInput):
-    if pipe is None:
-        return PredictionOut(
-            success_raw=0.0,
-            success_final=0.0,
-            applied_penalty=0.0,
-            features_used={"error": f"Model not loaded from {MODEL_PATH}"},
-            is_success=False,
-        )
+def model_not_loaded_output() -> PredictionOut:
+    return PredictionOut(
+        success_raw=0.0,
+        success_final=0.0,
+        applied_penalty=0.0,
+        features_used={"error": f"Model not loaded from {MODEL_PATH}"},
+        is_success=False,
+    )
 
+def mission_features(m: MissionInput, timer=None,
+                     ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> Tuple[dict, float]:
+    """(A)~(C): 클램프 → 무게 효과 → 모델 입력 dict. (features, 클램프된 payload) 반환 (ranges: 기본 FEATURE_RANGES)"""
     # (A) 숫자 입력을 CSV 범위로 클램프
-    payload        = clamp_by_api_name("payload_tons", m.payload_tons)
-    distance_ly    = clamp_by_api_name("distance_ly", m.distance_ly)
-    duration_years = clamp_by_api_name("duration_years", m.duration_years)
-    science_pts    = clamp_by_api_name("science_pts", m.science_pts)
-    crew_size      = int(round(clamp_by_api_name("crew_size", float(m.crew_size))))
-    fuel_tons      = clamp_by_api_name("fuel_tons", m.fuel_tons)
+    payload        = clamp_by_api_name("payload_tons", m.payload_tons, ranges)
+    distance_ly    = clamp_by_api_name("distance_ly", m.distance_ly, ranges)
+    duration_years = clamp_by_api_name("duration_years", m.duration_years, ranges)
+    science_pts    = clamp_by_api_name("science_pts", m.science_pts, ranges)
+    crew_size      = int(round(clamp_by_api_name("crew_size", float(m.crew_size), ranges)))
+    fuel_tons      = clamp_by_api_name("fuel_tons", m.fuel_tons, ranges)
+    if timer:
+        timer.mark("clamp")
 
     # (B) 무게 간접 영향 적용 (클램프된 값 기준)
     dur, sci, fuel = apply_payload_effects(payload, duration_years, science_pts, fuel_tons)
+    if timer:
+        timer.mark("payload_effects")
 
     # (C) 모델 입력 구성
     features = {
@@ -253,24 +453,794 @@ def predict(m: MissionInput):
         "Crew Size": int(crew_size),
         "Fuel Consumption (tons)": float(fuel),
     }
+    if timer:
+        timer.mark("features")
+    return features, payload
 
-    X = pd.DataFrame([features])
-    success_raw = float(pipe.predict(X)[0])
-
+def final_scores(m: MissionInput, payload: float, success_raw: float) -> Tuple[float, float, bool]:
+    """(D): (페널티, success_final, is_success)"""
     # (D) 고정 페널티: 무게 1톤당 0.4% 감소 + 최종 0~100 클립
-    penalty = 0.4 * payload
+    penalty = float(payload_penalty(payload))
     success_final = float(np.clip(success_raw - penalty, m.clamp_min, m.clamp_max))
 
     # ===== (3) 임계값 판정: success_final(0~100)을 0~1로 정규화해 비교 =====
-    is_success = bool(success_final >= SUCCESS_THRESHOLD_PERCENT)
+    return penalty, success_final, bool(success_final >= SUCCESS_THRESHOLD_PERCENT)
 
-    return PredictionOut(
+def finish_prediction(m: MissionInput, features: dict, payload: float, success_raw: float,
+                      timer=None) -> PredictionOut:
+    """(D): 페널티·클립·임계값 판정 후 PredictionOut 생성"""
+    penalty, success_final, is_success = final_scores(m, payload, success_raw)
+    if timer:
+        timer.mark("penalty")
+
+    out = PredictionOut(
         success_raw=round(success_raw, 4),
         success_final=round(success_final, 4),
         applied_penalty=round(penalty, 4),
         features_used=features,
         is_success=is_success,
     )
+    if timer:
+        timer.mark("response_model")
+    return out
+
+def compact_row(m: MissionInput, features: dict, payload: float, success_raw: float,
+                with_features: bool = False) -> list:
+    """(D)를 PredictionOut 없이 COMPACT_COLUMNS 순서 배열로"""
+    penalty, success_final, is_success = final_scores(m, payload, success_raw)
+    row = [round(success_raw, 4), round(success_final, 4), round(penalty, 4), is_success]
+    if with_features:
+        row.extend(features[c] for c in MODEL_FEATURE_COLUMNS)
+    return row
+
+def raw_prediction(m: MissionInput, timer=None) -> Tuple[dict, float, float]:
+    """단일 미션 → (features, 클램프된 payload, success_raw) (워커 스레드에서 실행)"""
+    features, payload = mission_features(m, timer)
+    return features, payload, cached_predict_one(features, timer)
+
+# 동시 요청 micro-batching: MICROBATCH_MAX_SIZE > 1 이면 활성 (기본 비활성)
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "0"))
+MICROBATCH_WAIT_MS = float(os.getenv("MICROBATCH_WAIT_MS", "2.0"))
+
+def predict_features_batch(rows: List[dict]) -> List[float]:
+    """features dict 목록 → success_raw 목록 (모델 호출 1회)"""
+    model = active_model
+    if len(rows) == 1:
+        return [model.predict_one(rows[0])]
+    return model.predict_rows(rows).tolist()
+
+micro_batcher = (
+    MicroBatcher(predict_features_batch, max_batch=MICROBATCH_MAX_SIZE, max_wait_ms=MICROBATCH_WAIT_MS)
+    if MICROBATCH_MAX_SIZE > 1 else None
+)
+
+# 승인 제어: ADMISSION_MAX_CONCURRENT > 0 이면 추론 엔드포인트 동시 실행 수 제한 (기본 비활성)
+# 대기열(ADMISSION_MAX_QUEUE)이 차거나 예상 대기가 ADMISSION_BUDGET_MS를 넘으면 503 + Retry-After,
+# /predict는 ADMISSION_DEGRADED_TREES > 0 이면 503 대신 기본 모델의 앞쪽 트리 일부로 응답 (X-Degraded 헤더).
+# /predict/batch, /sweep, /optimize, /predict/uncertainty는 admission_gate 의존성으로 요청당 슬롯 1개,
+# /predict/stream은 청크마다 슬롯을 기다린다(거절 없음 → 업로드 쪽으로 역압)
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "0"))
+admission = (
+    AdmissionController(
+        ADMISSION_MAX_CONCURRENT,
+        max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", str(ADMISSION_MAX_CONCURRENT * 4))),
+        budget_ms=float(os.getenv("ADMISSION_BUDGET_MS", "250")),
+    )
+    if ADMISSION_MAX_CONCURRENT > 0 else None
+)
+
+def overloaded_error(e: Overloaded, headers: Optional[dict] = None) -> HTTPException:
+    return HTTPException(status_code=503, detail=f"Server overloaded ({e.reason}); retry later",
+                         headers={"Retry-After": str(e.retry_after), SHED_HEADER: e.reason, **(headers or {})})
+
+async def admission_gate():
+    """/predict 외 추론 엔드포인트 의존성: 슬롯을 잡고(못 잡으면 503) 요청이 끝나면 반환"""
+    if admission is None:
+        yield
+        return
+    try:
+        await admission.acquire()
+    except Overloaded as e:
+        raise overloaded_error(e)
+    try:
+        yield
+    finally:
+        admission.release()
+
+def degraded_raw_prediction(m: MissionInput, name: str, explain: bool) -> Optional[Tuple[dict, float, float]]:
+    """
+    거절된 요청의 저비용 추정 (기본 모델, explain 아님, 트리 앙상블 + 고속 경로 인코딩일 때만). 불가하면 None.
+    인코딩과 일부 트리 순회만 하므로 스레드풀을 거치지 않고 이벤트 루프에서 바로 계산한다.
+    """
+    model = active_model
+    if DEGRADED_TREES <= 0 or explain or name != DEFAULT_MODEL_NAME or model is None:
+        return None
+    features, payload = mission_features(m)
+    success_raw = model.predict_subset_one(features, DEGRADED_TREES)
+    if success_raw is None:
+        return None
+    return features, payload, success_raw
+
+def overloaded_response(m: MissionInput, response: Response, name: str, explain: bool, compact: bool,
+                        with_features: bool, e: Overloaded):
+    """승인 거절 → 저하 모드 응답 또는 503 + Retry-After"""
+    degraded = degraded_raw_prediction(m, name, explain)
+    if degraded is None:
+        raise overloaded_error(e, {"X-Model": name})
+    admission.degraded += 1
+    features_used, payload, success_raw = degraded
+    headers = {"X-Model": name, "X-Degraded": f"trees={active_model.subset_forest(DEGRADED_TREES).n_trees}"}
+    if compact:
+        return CompactJSONResponse(compact_row(m, features_used, payload, success_raw, with_features), headers=headers)
+    response.headers.update(headers)
+    return finish_prediction(m, features_used, payload, success_raw)
+
+def explain_output(out: PredictionOut, bias: float, contrib: np.ndarray) -> ExplainedPredictionOut:
+    """PredictionOut + 입력 컬럼별 기여도 (contrib: MODEL_FEATURE_COLUMNS 순서, 마지막 칸은 대응 없는 열)"""
+    contributions = {c: round(float(v), 4) for c, v in zip(MODEL_FEATURE_COLUMNS, contrib)}
+    if len(contrib) > len(MODEL_FEATURE_COLUMNS) and abs(contrib[-1]) > 1e-12:
+        contributions["other"] = round(float(contrib[-1]), 4)
+    return ExplainedPredictionOut(
+        **out.model_dump(),
+        explanation=ExplanationOut(
+            bias=round(bias, 4),
+            contributions=contributions,
+            payload_penalty=out.applied_penalty,
+            clamp_adjustment=round(out.success_final - (out.success_raw - out.applied_penalty), 4),
+        ),
+    )
+
+def explain_mission(m: MissionInput, model: LoadedModel) -> Tuple[ExplainedPredictionOut, float]:
+    """단일 미션 예측 + 트리 경로 기여도 (순회 1회로 예측값과 기여도를 함께 계산) → (응답, 반올림 전 success_raw)"""
+    features, payload = mission_features(m)
+    explained = model.explain_one(features)
+    if explained is None:
+        raise HTTPException(status_code=422, detail="Current model does not support tree path explanations")
+    success_raw, contrib, bias = explained
+    return explain_output(finish_prediction(m, features, payload, success_raw), bias, contrib), success_raw
+
+def registry_raw_prediction(m: MissionInput, name: str) -> Tuple[dict, float, float]:
+    """등록 모델(기본 모델 제외)로 (features, payload, success_raw). 예측 캐시/micro-batcher는 기본 모델 전용."""
+    model = registry_model(name)
+    features, payload = mission_features(m)
+    return features, payload, model.predict_one(features)
+
+def predict_with_model(m: MissionInput, name: str, explain: bool = False) -> Tuple[PredictionOut, float]:
+    """등록 모델(기본 모델 제외)로 단일 예측 → (응답, 반올림 전 success_raw)"""
+    if explain:
+        return explain_mission(m, registry_model(name))
+    features, payload, success_raw = registry_raw_prediction(m, name)
+    return finish_prediction(m, features, payload, success_raw), success_raw
+
+def record_model_usage(name: str, rows: int, seconds: float, error: bool = False) -> None:
+    model_registry.record(name, rows, seconds, error)
+    if METRICS_ENABLED:
+        metrics.observe("model_request_seconds", seconds, model=name)
+
+@app.post("/predict", response_model=Union[ExplainedPredictionOut, PredictionOut])
+async def predict(
+    m: MissionInput,
+    response: Response,
+    mode: str = Query(default="exact", description="exact: 모델 평가, approx: 응답 곡면 보간(준비 안 됐으면 exact)"),
+    explain: bool = Query(default=False, description="true면 feature별 기여도(explanation) 포함"),
+    model_name: Optional[str] = Query(default=None, alias="model",
+                                      description="모델 이름 (생략 시 MODEL_SPLIT 가중치, 설정이 없으면 기본 모델)"),
+    fmt: str = Query(default="full", alias="format", description="full: PredictionOut, compact: COMPACT_COLUMNS 순서 배열"),
+    features: bool = Query(default=False, description="compact에서 features_used 값을 행 뒤에 붙임"),
+):
+    compact = is_compact_format(fmt)
+    mode = predict_mode(mode)
+    if compact and explain:
+        raise HTTPException(status_code=422, detail="explain is not available with format=compact")
+    name = resolve_model_name(model_name)
+    response.headers["X-Model"] = name
+    if admission is not None:
+        try:
+            await admission.acquire()
+        except Overloaded as e:
+            return overloaded_response(m, response, name, explain, compact, features, e)
+    t0 = time.perf_counter()
+    try:
+        if compact:
+            features_used, payload, success_raw = await compact_raw_prediction(m, name, mode)
+        elif name == DEFAULT_MODEL_NAME:
+            out, success_raw = await predict_default(m, mode, explain)
+        else:
+            out, success_raw = await run_in_threadpool(predict_with_model, m, name, explain)
+    except Exception:
+        record_model_usage(name, 1, time.perf_counter() - t0, error=True)
+        raise
+    finally:
+        if admission is not None:
+            admission.release(time.perf_counter() - t0)
+    record_model_usage(name, 1, time.perf_counter() - t0)
+    if compact:
+        model_registry.submit_shadow(name, [features_used], [success_raw])
+        return CompactJSONResponse(compact_row(m, features_used, payload, success_raw, features),
+                                   headers={"X-Model": name})
+    if model_registry.shadow is not None and success_raw is not None:
+        model_registry.submit_shadow(name, [out.features_used], [success_raw])  # 반올림 전 값과 비교
+    return out
+
+async def default_raw_prediction(m: MissionInput, mode: str = "exact", timer=None) -> Tuple[dict, float, float]:
+    """기본 모델(active_model) 단일 예측 → (features, payload, success_raw): 응답 곡면 / 예측 캐시 / micro-batcher 경로"""
+    if mode == "approx":
+        features, payload = mission_features(m, timer)
+        success_raw = approx_predict_one(active_model, features)
+        if success_raw is not None:
+            if timer:
+                timer.mark("approx")
+            return features, payload, success_raw
+    if micro_batcher is None:
+        return await run_in_threadpool(raw_prediction, m, timer)
+
+    # 클램프/feature 구성은 가벼우므로 이벤트 루프에서, 모델 호출만 배치로 묶음
+    features, payload = mission_features(m, timer)
+    key = prediction_cache.make_key(features) if prediction_cache.enabled else None
+    success_raw = prediction_cache.get(key) if key is not None else None
+    if timer:
+        timer.mark("cache")
+    if success_raw is None:
+        generation = prediction_cache.generation
+        success_raw = await micro_batcher.submit(features)
+        if timer:
+            timer.mark("micro_batch")
+        if key is not None:
+            prediction_cache.put(key, success_raw, generation)
+    return features, payload, success_raw
+
+async def predict_default(m: MissionInput, mode: str = "exact",
+                          explain: bool = False) -> Tuple[PredictionOut, Optional[float]]:
+    """기본 모델(active_model) 단일 예측 → (PredictionOut, 반올림 전 success_raw; 모델이 없으면 None)"""
+    model = active_model
+    if model is None:
+        if METRICS_ENABLED:
+            metrics.inc("model_not_loaded_total")
+        return model_not_loaded_output(), None
+    if explain:
+        return await run_in_threadpool(explain_mission, m, model)
+    timer = metrics.timer() if METRICS_ENABLED else None
+    features, payload, success_raw = await default_raw_prediction(m, mode, timer)
+    return finish_prediction(m, features, payload, success_raw, timer), success_raw
+
+async def compact_raw_prediction(m: MissionInput, name: str, mode: str) -> Tuple[dict, float, float]:
+    if name != DEFAULT_MODEL_NAME:
+        return await run_in_threadpool(registry_raw_prediction, m, name)
+    if active_model is None:
+        if METRICS_ENABLED:
+            metrics.inc("model_not_loaded_total")
+        raise HTTPException(status_code=503, detail=f"Model not loaded from {MODEL_PATH}")
+    return await default_raw_prediction(m, mode, metrics.timer() if METRICS_ENABLED else None)
+
+# =========================
+# 5-1) 배치 예측 (클램프/무게 효과/페널티를 배열 연산으로, 모델 호출 1회)
+# =========================
+def broadcast_mission(m: MissionInput, n: int) -> Dict[str, np.ndarray]:
+    """미션 1건을 n행 열 배열로 복제 (그리드/샘플링의 기준값)"""
+    cols = {name: np.full(n, float(getattr(m, name))) for name in NUMERIC_INPUT_FIELDS}
+    for name in CATEGORICAL_INPUT_FIELDS:
+        cols[name] = np.full(n, getattr(m, name), dtype=object)
+    return cols
+
+def score_columns(cols: Dict[str, np.ndarray], model: Optional[LoadedModel] = None,
+                  explain: bool = False) -> Dict[str, object]:
+    """
+    scoring.score_columns를 현재 범위(FEATURE_RANGES)로 호출: 클램프/무게 효과 → 모델 1회 호출 → 페널티/클립/임계값.
+    결과는 배열 dict (X, success_raw, applied_penalty, success_final, is_success).
+    explain=True면 contributions/bias도 계산 (지원하지 않으면 HTTP 422).
+    model을 주지 않으면 현재 모델(active_model) 사용.
+    """
+    model = model or active_model
+    if explain and model.explainer() is None:
+        raise HTTPException(status_code=422, detail="Current model does not support tree path explanations")
+    return scoring.score_columns(cols, model, FEATURE_RANGES, explain=explain)
+
+def finalize_predictions(scored: Dict[str, object]) -> List[PredictionOut]:
+    """score_columns 결과 → PredictionOut 목록 (explain=True로 채점했으면 ExplainedPredictionOut)"""
+    if "contributions" in scored:
+        plain = finalize_predictions({k: v for k, v in scored.items() if k != "contributions"})
+        return [explain_output(out, scored["bias"], contrib) for out, contrib in zip(plain, scored["contributions"])]
+    return [
+        PredictionOut(
+            success_raw=round(raw, 4),
+            success_final=round(final, 4),
+            applied_penalty=round(pen, 4),
+            features_used=features,
+            is_success=ok,
+        )
+        for raw, final, pen, ok, features in zip(
+            scored["success_raw"].tolist(), scored["success_final"].tolist(),
+            scored["applied_penalty"].tolist(), scored["is_success"].tolist(),
+            scored["X"].to_dict("records"),
+        )
+    ]
+
+def compact_rows(scored: Dict[str, object], with_features: bool = False) -> list:
+    """score_columns 결과 → COMPACT_COLUMNS 순서 행 배열 목록 (PredictionOut 생성 없음)"""
+    rows = [list(r) for r in zip(
+        np.round(scored["success_raw"], 4).tolist(), np.round(scored["success_final"], 4).tolist(),
+        np.round(scored["applied_penalty"], 4).tolist(), scored["is_success"].tolist(),
+    )]
+    if with_features:
+        for row, values in zip(rows, scored["X"].itertuples(index=False, name=None)):
+            row.extend(values)
+    return rows
+
+@app.post("/predict/batch", response_model=List[Union[ExplainedPredictionOut, PredictionOut]],
+          dependencies=[Depends(admission_gate)])
+def predict_batch(
+    missions: List[MissionInput],
+    response: Response,
+    explain: bool = Query(default=False, description="true면 feature별 기여도(explanation) 포함"),
+    model_name: Optional[str] = Query(default=None, alias="model",
+                                      description="모델 이름 (생략 시 MODEL_SPLIT 가중치, 설정이 없으면 기본 모델)"),
+    fmt: str = Query(default="full", alias="format", description="full: PredictionOut 목록, compact: 행 배열 목록"),
+    features: bool = Query(default=False, description="compact에서 features_used 값을 행 뒤에 붙임"),
+):
+    """여러 미션을 한 번에 예측 (DataFrame 1회 생성 + 모델 호출 1회)"""
+    compact = is_compact_format(fmt)
+    if compact and explain:
+        raise HTTPException(status_code=422, detail="explain is not available with format=compact")
+    name = resolve_model_name(model_name)
+    response.headers["X-Model"] = name
+    if name == DEFAULT_MODEL_NAME and active_model is None:
+        if compact:
+            raise HTTPException(status_code=503, detail=f"Model not loaded from {MODEL_PATH}")
+        return [model_not_loaded_output() for _ in missions]
+    if not missions:
+        return CompactJSONResponse([], headers={"X-Model": name}) if compact else []
+    t0 = time.perf_counter()
+    try:
+        model = active_model if name == DEFAULT_MODEL_NAME else registry_model(name)
+        scored = score_columns(missions_to_columns(missions), model, explain=explain)
+    except Exception:
+        record_model_usage(name, len(missions), time.perf_counter() - t0, error=True)
+        raise
+    record_model_usage(name, len(missions), time.perf_counter() - t0)
+    model_registry.submit_shadow(name, scored["X"], scored["success_raw"])
+    if compact:
+        return CompactJSONResponse(compact_rows(scored, features), headers={"X-Model": name})
+    return finalize_predictions(scored)
+
+# =========================
+# 5-2) 민감도 스윕 / 히트맵 (1~2개 입력을 CSV 범위 전체로 움직인 그리드를 배치 1회로 평가)
+# =========================
+SWEEP_MAX_RESOLUTION = int(os.getenv("SWEEP_MAX_RESOLUTION", "200"))
+
+class SweepRequest(BaseModel):
+    base: MissionInput
+    x: str = Field(description="가로축 API 필드명 (API2CSV 키)")
+    y: Optional[str] = Field(default=None, description="세로축 API 필드명 (없으면 1차원 스윕)")
+    resolution: int = Field(default=25, ge=2, description="축별 격자 점 개수")
+
+class SweepOut(BaseModel):
+    x_field: str
+    x_values: List[float]
+    y_field: Optional[str] = None
+    y_values: Optional[List[float]] = None
+    success_raw: list      # 1차원: [len(x)], 2차원: [len(y)][len(x)]
+    success_final: list
+    is_success: list
+    success_threshold_percent: float
+
+def sweep_axis(api_name: str, resolution: int) -> np.ndarray:
+    """CSV 범위를 resolution개로 나눈 격자 (crew_size는 정수, 중복 제거)"""
+    lo, hi = get_range_by_api_name(api_name)
+    values = np.linspace(lo, hi, resolution)
+    if api_name == "crew_size":
+        values = np.unique(np.round(values))
+    return values
+
+@app.post("/sweep", response_model=SweepOut, dependencies=[Depends(admission_gate)])
+def sweep(
+    req: SweepRequest,
+    fmt: str = Query(default="full", alias="format", description="compact: 같은 키를 검증 없이 바로 직렬화"),
+):
+    """기준 미션에서 x(,y) 입력만 바꾼 격자 전체를 한 번의 배치 추론으로 평가"""
+    compact = is_compact_format(fmt)
+    if active_model is None:
+        raise HTTPException(status_code=503, detail=f"Model not loaded from {MODEL_PATH}")
+    for name in (req.x, req.y):
+        if name is not None and name not in API2CSV:
+            raise HTTPException(status_code=422, detail=f"Unknown sweep field '{name}' (choose from {list(API2CSV)})")
+    if req.y == req.x:
+        raise HTTPException(status_code=422, detail="x and y must be different fields")
+    resolution = min(req.resolution, SWEEP_MAX_RESOLUTION)
+
+    xs = sweep_axis(req.x, resolution)
+    ys = sweep_axis(req.y, resolution) if req.y else None
+    if ys is None:
+        cols = broadcast_mission(req.base, len(xs))
+        cols[req.x] = xs
+        shape = (len(xs),)
+    else:
+        gy, gx = np.meshgrid(ys, xs, indexing="ij")  # 행: y, 열: x
+        cols = broadcast_mission(req.base, gx.size)
+        cols[req.x] = gx.ravel()
+        cols[req.y] = gy.ravel()
+        shape = gx.shape
+
+    scored = score_columns(cols)
+    if compact:
+        return CompactJSONResponse({
+            "x_field": req.x,
+            "x_values": xs,
+            "y_field": req.y,
+            "y_values": ys,
+            "success_raw": np.round(scored["success_raw"], 4).reshape(shape),
+            "success_final": np.round(scored["success_final"], 4).reshape(shape),
+            "is_success": scored["is_success"].reshape(shape),
+            "success_threshold_percent": SUCCESS_THRESHOLD_PERCENT,
+        })
+    return SweepOut(
+        x_field=req.x,
+        x_values=xs.tolist(),
+        y_field=req.y,
+        y_values=ys.tolist() if ys is not None else None,
+        success_raw=np.round(scored["success_raw"], 4).reshape(shape).tolist(),
+        success_final=np.round(scored["success_final"], 4).reshape(shape).tolist(),
+        is_success=scored["is_success"].reshape(shape).tolist(),
+        success_threshold_percent=SUCCESS_THRESHOLD_PERCENT,
+    )
+
+# =========================
+# 5-3) 응답 곡면 인덱스 (/predict?mode=approx): 범주 조합 × 수치 격자를 미리 계산해 다중 선형 보간
+# =========================
+RESPONSE_SURFACE = os.getenv("RESPONSE_SURFACE", "0") == "1"
+SURFACE_GRID = max(2, int(os.getenv("SURFACE_GRID", "5")))  # 수치 feature 축별 격자 점 개수
+SURFACE_PATH = os.getenv("SURFACE_PATH", "")                # 비우면 <MODEL_PATH>.surface(.npy/.json)
+response_surface: Optional[ResponseSurface] = None
+_surface_lock = threading.Lock()
+
+def model_feature_axes(grid: int) -> Dict[str, np.ndarray]:
+    """클램프 + 무게 효과 이후 모델 수치 입력이 가질 수 있는 범위를 grid개로 나눈 축"""
+    p_lo, p_hi = get_range_by_api_name("payload_tons")
+    d_lo, d_hi = get_range_by_api_name("distance_ly")
+    t_lo, t_hi = get_range_by_api_name("duration_years")
+    s_lo, s_hi = get_range_by_api_name("science_pts")
+    c_lo, c_hi = get_range_by_api_name("crew_size")
+    f_lo, f_hi = get_range_by_api_name("fuel_tons")
+    dur_lo, sci_lo, fuel_lo = apply_payload_effects(p_lo, t_lo, s_lo, f_lo)
+    dur_hi, _, fuel_hi = apply_payload_effects(p_hi, t_hi, s_hi, f_hi)
+    _, sci_lo, _ = apply_payload_effects(p_hi, t_lo, s_lo, f_lo)   # 과학 점수는 payload가 클수록 작아짐
+    _, sci_hi, _ = apply_payload_effects(p_lo, t_hi, s_hi, f_hi)
+    return {
+        "Distance from Earth (light-years)": np.linspace(d_lo, d_hi, grid),
+        "Mission Duration (years)": np.linspace(dur_lo, dur_hi, grid),
+        "Scientific Yield (points)": np.linspace(float(sci_lo), float(sci_hi), grid),
+        "Crew Size": np.linspace(round(c_lo), round(c_hi), grid),
+        "Fuel Consumption (tons)": np.linspace(fuel_lo, fuel_hi, grid),
+    }
+
+def prepare_response_surface(model: LoadedModel) -> Optional[ResponseSurface]:
+    """사이드카가 같은 모델 버전·축이면 mmap으로 읽고, 아니면 격자 전체를 배치 평가해 만들고 저장"""
+    path = SURFACE_PATH or f"{model.path}.surface"
+    axes = model_feature_axes(SURFACE_GRID)
+    try:
+        surface = ResponseSurface.load(path, mmap=True)
+        if surface.model_version == model.version and surface.numeric_columns == list(axes) and all(
+            len(a) == len(b) and np.allclose(a, b) for a, b in zip(surface.axes, axes.values())
+        ):
+            return surface
+    except (OSError, ValueError, KeyError):
+        pass
+
+    t0 = time.perf_counter()
+    surface = build_response_surface(
+        model.predict_frame,
+        MODEL_FEATURE_COLUMNS,
+        {"Mission Type": MISSION_TYPES, "Target Type": TARGET_TYPES, "Launch Vehicle": LAUNCHERS},
+        axes,
+        model.version,
+    )
+    try:
+        surface.save(path)
+    except OSError as e:
+        print(f"[WARN] Could not save response surface to '{path}': {e}")
+    print(f"[INFO] Built response surface in {time.perf_counter() - t0:.2f}s: {surface.info()}")
+    return surface
+
+def refresh_response_surface() -> None:
+    """현재 모델 기준으로 응답 곡면 준비 (백그라운드 스레드에서 호출)"""
+    global response_surface
+    with _surface_lock:
+        model = active_model
+        if model is None:
+            return
+        try:
+            response_surface = prepare_response_surface(model)
+        except Exception as e:
+            print(f"[WARN] Could not prepare response surface: {e}")
+
+def start_response_surface_refresh() -> None:
+    if RESPONSE_SURFACE:
+        threading.Thread(target=refresh_response_surface, daemon=True, name="response-surface").start()
+
+def approx_predict_one(model: LoadedModel, features: dict) -> Optional[float]:
+    """응답 곡면 근사값. 곡면이 준비되지 않았거나 모델 버전이 다르면 None(=정확 경로)."""
+    surface = response_surface
+    if surface is None or surface.model_version != model.version:
+        return None
+    return surface.predict_one(features)
+
+# =========================
+# 5-4) 미션 최적화 (랜덤 탐색 → 좌표별 정밀화, 후보는 매 단계 배치 1회로 평가)
+# =========================
+OPTIMIZE_MAX_BUDGET = int(os.getenv("OPTIMIZE_MAX_BUDGET", "20000"))
+OPTIMIZE_REFINE_POINTS = 9  # 정밀화 단계에서 축마다 평가할 후보 수
+
+class OptimizeRequest(BaseModel):
+    base: MissionInput = Field(description="고정 값(범주 필드 + free가 아닌 숫자 필드)")
+    free: List[str] = Field(default_factory=lambda: ["payload_tons", "fuel_tons", "crew_size"],
+                            description="탐색할 숫자 API 필드명 (API2CSV 키)")
+    bounds: Dict[str, Tuple[float, float]] = Field(default_factory=dict,
+                                                   description="필드별 추가 제한 (CSV 범위와 교집합)")
+    budget: int = Field(default=2000, ge=10, description="최대 평가 횟수")
+    seed: Optional[int] = None
+
+class OptimizeOut(BaseModel):
+    best_input: dict
+    prediction: PredictionOut
+    base_success_final: float  # 요청한 base 미션 그대로의 점수 (bounds 밖이어도 클립하지 않음)
+    evaluations: int
+
+@app.post("/optimize", response_model=OptimizeOut, dependencies=[Depends(admission_gate)])
+def optimize(req: OptimizeRequest):
+    """free 필드를 CSV 범위 안에서 움직여 success_final(페널티·무게 효과 포함)을 최대화"""
+    if active_model is None:
+        raise HTTPException(status_code=503, detail=f"Model not loaded from {MODEL_PATH}")
+    free = list(dict.fromkeys(req.free))
+    if not free:
+        raise HTTPException(status_code=422, detail="free must list at least one field")
+    unused_bounds = [name for name in req.bounds if name not in free]
+    if unused_bounds:
+        raise HTTPException(status_code=422, detail=f"bounds given for fields not in free: {unused_bounds}")
+    lo, hi = np.empty(len(free)), np.empty(len(free))
+    for j, name in enumerate(free):
+        if name not in API2CSV:
+            raise HTTPException(status_code=422, detail=f"Unknown field '{name}' (choose from {list(API2CSV)})")
+        rng_j = get_range_by_api_name(name)
+        if name in req.bounds:
+            rng_j = intersect_range(rng_j, tuple(sorted(req.bounds[name])))
+            if rng_j is None:
+                raise HTTPException(status_code=422, detail=f"bounds for '{name}' do not overlap its range")
+        lo[j], hi[j] = rng_j
+    budget = min(req.budget, OPTIMIZE_MAX_BUDGET)
+    model = active_model
+    rng = np.random.default_rng(req.seed)
+
+    def evaluate(points: np.ndarray) -> np.ndarray:
+        cols = broadcast_mission(req.base, len(points))
+        for j, name in enumerate(free):
+            cols[name] = points[:, j]
+        return score_columns(cols, model)["success_final"]
+
+    # (0) 비교 기준: 사용자가 보낸 base 미션 그대로 (탐색 시작점은 bounds 안으로 클립하므로 따로 채점)
+    base_score = float(score_columns(missions_to_columns([req.base]), model)["success_final"][0])
+
+    # (1) 기준 미션(bounds 안으로 클립) + 랜덤 탐색 (예산의 절반)
+    base_point = np.clip([float(getattr(req.base, name)) for name in free], lo, hi)
+    n_random = max(1, budget // 2 - 1)
+    points = np.vstack([base_point, lo + (hi - lo) * rng.random((n_random, len(free)))])
+    scores = evaluate(points)
+    used = len(points)
+    best = int(np.argmax(scores))
+    best_point, best_score = points[best], float(scores[best])
+
+    # (2) 좌표별 정밀화: 최적점 주변에서 축마다 후보를 만들어 한 배치로 평가, 반경은 매 라운드 절반
+    radius = (hi - lo) / 4.0
+    round_size = len(free) * OPTIMIZE_REFINE_POINTS
+    while used + round_size <= budget and np.any(radius > 1e-9 * np.maximum(hi - lo, 1.0)):
+        candidates = np.repeat(best_point[None, :], round_size, axis=0)
+        for j in range(len(free)):
+            rows = slice(j * OPTIMIZE_REFINE_POINTS, (j + 1) * OPTIMIZE_REFINE_POINTS)
+            candidates[rows, j] = np.linspace(
+                max(lo[j], best_point[j] - radius[j]), min(hi[j], best_point[j] + radius[j]),
+                OPTIMIZE_REFINE_POINTS,
+            )
+        scores = evaluate(candidates)
+        used += round_size
+        i = int(np.argmax(scores))
+        if scores[i] > best_score:
+            best_point, best_score = candidates[i], float(scores[i])
+        radius = radius / 2.0
+
+    best_input = req.base.model_dump()
+    for j, name in enumerate(free):
+        best_input[name] = int(round(best_point[j])) if name == "crew_size" else float(best_point[j])
+    prediction = finalize_predictions(score_columns(missions_to_columns([MissionInput(**best_input)]), model))[0]
+    return OptimizeOut(
+        best_input=best_input,
+        prediction=prediction,
+        base_success_final=round(base_score, 4),
+        evaluations=used,
+    )
+
+# =========================
+# 5-5) 스트리밍 채점 (NDJSON/CSV 업로드를 STREAM_CHUNK_ROWS행씩 채점해 NDJSON으로 바로 응답)
+# =========================
+STREAM_CHUNK_ROWS = max(1, int(os.getenv("STREAM_CHUNK_ROWS", "1000")))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+CSV2API = {csv_name: api_name for api_name, csv_name in API2CSV.items()}
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    요청 본문을 읽는 도중에 응답을 내보내는 StreamingResponse.
+    기본 구현은 연결 종료 감시를 위해 receive()를 따로 읽어 본문 메시지를 가로챌 수 있으므로,
+    본문 수신(과 연결 종료 감지)은 제너레이터의 request.stream()에 맡긴다.
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+async def iter_body_lines(request: Request):
+    """요청 본문을 줄 단위로 (줄 하나가 STREAM_MAX_LINE_BYTES를 넘으면 ValueError)"""
+    buffer = b""
+    async for part in request.stream():
+        buffer += part
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > STREAM_MAX_LINE_BYTES:
+            raise ValueError(f"line longer than {STREAM_MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield buffer
+
+def parse_stream_row(line: bytes, header: Optional[List[str]]) -> MissionInput:
+    """NDJSON 한 줄 또는 (header가 있으면) CSV 한 줄 → MissionInput (빈 CSV 칸은 기본값)"""
+    if header is None:
+        return MissionInput.model_validate_json(line)
+    values = next(csv.reader([line.decode("utf-8")]))
+    if len(values) != len(header):
+        raise ValueError(f"expected {len(header)} CSV values (header columns), got {len(values)}")
+    return MissionInput.model_validate({k: v for k, v in zip(header, values) if v != ""})
+
+def stream_row_error(line_no: int, e: Exception) -> dict:
+    if isinstance(e, ValidationError):
+        detail = e.errors(include_url=False, include_context=False, include_input=False)
+    else:
+        detail = str(e)
+    return {"line": line_no, "error": detail}
+
+def score_stream_chunk(items: List[object], model: LoadedModel) -> bytes:
+    """MissionInput/오류 dict가 섞인 청크 → 입력 순서 그대로의 NDJSON 바이트"""
+    missions = [it for it in items if isinstance(it, MissionInput)]
+    outs = iter(finalize_predictions(score_columns(missions_to_columns(missions), model)) if missions else [])
+    lines = [next(outs).model_dump_json() if isinstance(it, MissionInput) else json.dumps(it, ensure_ascii=False)
+             for it in items]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+async def score_stream_chunk_gated(items: List[object], model: LoadedModel) -> bytes:
+    """승인 제어가 켜져 있으면 청크마다 슬롯을 기다린 뒤(거절 없음) 워커 스레드에서 채점"""
+    if admission is None:
+        return await run_in_threadpool(score_stream_chunk, items, model)
+    await admission.acquire(shed=False)
+    try:
+        return await run_in_threadpool(score_stream_chunk, items, model)
+    finally:
+        admission.release()
+
+async def stream_predictions(request: Request, csv_input: bool, model: LoadedModel):
+    header: Optional[List[str]] = None
+    items: List[object] = []
+    line_no = 0
+    try:
+        async for line in iter_body_lines(request):
+            line_no += 1
+            line = line.strip()
+            if not line:
+                continue
+            if csv_input and header is None:
+                header = [CSV2API.get(h.strip(), h.strip()) for h in next(csv.reader([line.decode("utf-8")]))]
+                continue
+            try:
+                items.append(parse_stream_row(line, header if csv_input else None))
+            except (ValidationError, ValueError) as e:
+                items.append(stream_row_error(line_no, e))
+            if len(items) >= STREAM_CHUNK_ROWS:
+                yield await score_stream_chunk_gated(items, model)
+                items = []
+    except ValueError as e:  # 줄 길이 초과 → 지금까지 받은 행만 채점하고 종료
+        items.append(stream_row_error(line_no + 1, e))
+    if items:
+        yield await score_stream_chunk_gated(items, model)
+
+@app.post("/predict/stream")
+async def predict_stream(
+    request: Request,
+    fmt: Optional[str] = Query(default=None, alias="format", description="ndjson | csv (생략 시 Content-Type으로 판단)"),
+):
+    """
+    MissionInput 행을 NDJSON(한 줄에 객체 1개) 또는 CSV(첫 줄 헤더)로 스트리밍 업로드하면
+    STREAM_CHUNK_ROWS행마다 /predict/batch와 같은 경로로 채점해 PredictionOut을 NDJSON으로 바로 내보낸다.
+    검증에 실패한 행은 같은 위치에 {"line": 줄 번호, "error": ...}로 표시.
+    """
+    model = active_model
+    if model is None:
+        raise HTTPException(status_code=503, detail=f"Model not loaded from {MODEL_PATH}")
+    fmt = (fmt or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")).lower()
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=422, detail="format must be 'ndjson' or 'csv'")
+    return DuplexStreamingResponse(stream_predictions(request, fmt == "csv", model),
+                                   media_type="application/x-ndjson")
+
+# =========================
+# 5-6) 예측 불확실성 (트리별 분포 + 입력 섭동 몬테카를로, 각각 배치 1회로 평가)
+# =========================
+UNCERTAINTY_MAX_SAMPLES = int(os.getenv("UNCERTAINTY_MAX_SAMPLES", "10000"))
+
+class UncertaintyRequest(BaseModel):
+    mission: MissionInput
+    quantiles: List[float] = Field(default_factory=lambda: [0.05, 0.25, 0.5, 0.75, 0.95])
+    samples: int = Field(default=0, ge=0, description="몬테카를로 섭동 샘플 수 (0이면 생략)")
+    spread: float = Field(default=0.05, gt=0, le=1.0, description="섭동 표준편차 (필드별 CSV 범위 폭 대비 비율)")
+    fields: Optional[List[str]] = Field(default=None, description="섭동할 숫자 API 필드명 (기본: 전체)")
+    seed: Optional[int] = None
+
+class SpreadOut(BaseModel):
+    """success_final(페널티·클립 적용 후) 표본 분포 요약"""
+    n: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    quantiles: Dict[str, float]
+    p_success: float  # success_final >= SUCCESS_THRESHOLD_PERCENT 비율
+
+class UncertaintyOut(BaseModel):
+    prediction: PredictionOut
+    trees: Optional[SpreadOut] = None        # 트리 앙상블이 아니면 None
+    monte_carlo: Optional[SpreadOut] = None  # samples=0이면 None
+
+def spread_summary(final: np.ndarray, quantiles: List[float]) -> SpreadOut:
+    """success_final 표본 → 요약"""
+    qs = np.quantile(final, quantiles) if quantiles else []
+    return SpreadOut(
+        n=int(final.size),
+        mean=round(float(final.mean()), 4),
+        std=round(float(final.std()), 4),
+        min=round(float(final.min()), 4),
+        max=round(float(final.max()), 4),
+        quantiles={f"p{q * 100:g}": round(float(v), 4) for q, v in zip(quantiles, qs)},
+        p_success=round(float(np.mean(final >= SUCCESS_THRESHOLD_PERCENT)), 4),
+    )
+
+@app.post("/predict/uncertainty", response_model=UncertaintyOut, dependencies=[Depends(admission_gate)])
+def predict_uncertainty(req: UncertaintyRequest):
+    """
+    trees: 포레스트의 트리별 success_final 분포 (모든 트리를 한 번에 평가, 트리별 예측에 같은 페널티·클립 적용).
+    monte_carlo: 숫자 입력을 CSV 범위 폭 × spread 표준편차로 흔든 samples개 미션을 배치 1회로 채점.
+    두 블록 모두 prediction.success_final과 같은 척도다.
+    """
+    model = active_model
+    if model is None:
+        raise HTTPException(status_code=503, detail=f"Model not loaded from {MODEL_PATH}")
+    if any(not 0.0 <= q <= 1.0 for q in req.quantiles):
+        raise HTTPException(status_code=422, detail="quantiles must be between 0 and 1")
+    fields = list(dict.fromkeys(req.fields if req.fields is not None else API2CSV))
+    for name in fields:
+        if name not in API2CSV:
+            raise HTTPException(status_code=422, detail=f"Unknown field '{name}' (choose from {list(API2CSV)})")
+    m = req.mission
+
+    base_cols = missions_to_columns([m])
+    scored = score_columns(base_cols, model)
+    out = UncertaintyOut(prediction=finalize_predictions(scored)[0])
+
+    per_tree = model.predict_per_tree(scored["X"])
+    if per_tree is not None:
+        tree_raw = per_tree[:, 0]
+        tree_final = np.clip(tree_raw - scored["applied_penalty"][0], m.clamp_min, m.clamp_max)
+        out.trees = spread_summary(tree_final, req.quantiles)
+
+    n = min(req.samples, UNCERTAINTY_MAX_SAMPLES)
+    if n > 0:
+        rng = np.random.default_rng(req.seed)
+        cols = broadcast_mission(m, n)
+        for name in fields:
+            lo, hi = get_range_by_api_name(name)
+            cols[name] = np.clip(cols[name] + rng.normal(0.0, req.spread * (hi - lo), n), lo, hi)
+        out.monte_carlo = spread_summary(score_columns(cols, model)["success_final"], req.quantiles)
+    return out
 
 # =========================
 # 6) 난이도별 랜덤 프리셋 생성 (CSV 범위 내부에서 easy ⊂ normal ⊂ hard)
@@ -285,54 +1255,337 @@ MISSION_TYPES  = ["Exploration", "Research", "Mining", "Colonization"]
 TARGET_TYPES   = ["Planet", "Moon", "Asteroid", "Exoplanet", "Star"]
 LAUNCHERS      = ["Starship", "Falcon Heavy", "SLS", "Ariane 6"]
 
-def random_preset(difficulty: str = "normal", seed: Optional[int] = None) -> dict:
+# 프리셋 숫자 필드: (API 이름, invert, 소수 자릿수). 순서 = 난수 소비 순서 (기존 random_preset과 동일)
+#   invert=False: 큰 값일수록 어려움, invert=True: 큰 값일수록 쉬움
+PRESET_NUMERIC_FIELDS = [
+    ("payload_tons",   False, 1),
+    ("distance_ly",    False, 1),
+    ("duration_years", False, 1),
+    ("fuel_tons",      False, 0),
+    ("science_pts",    True,  1),
+    ("crew_size",      True,  None),
+]
+PRESETS_MAX_N = int(os.getenv("PRESETS_MAX_N", "100000"))
+
+def normalize_difficulty(difficulty: Optional[str]) -> str:
+    diff = (difficulty or "normal").lower()
+    return diff if diff in ("easy", "normal", "hard") else "normal"
+
+def random_presets(difficulty: str = "normal", n: int = 1, seed: Optional[int] = None) -> List[dict]:
     """
-    모든 숫자 feature를 CSV min~max 범위 안에서만 생성.
-    - 큰 값일수록 어려운 지표 (invert=False): payload_tons, distance_ly, duration_years, fuel_tons
-    - 큰 값일수록 쉬운 지표 (invert=True) : science_pts, crew_size
-    난이도는 중첩(easy ⊂ normal ⊂ hard)되도록 밴드를 자른다.
+    프리셋 n개를 한 번에 생성. 숫자 필드는 (n, 6) 균등 난수 1회 추출 후 밴드로 변환(행 우선),
+    범주 필드는 같은 시드의 random.Random에서 프리셋 순서대로 뽑는다.
+    → 같은 seed면 항상 같은 결과이고, 첫 번째 프리셋은 /preset?seed=seed와 동일,
+      앞쪽 m개는 n에 관계없이 같다 (n=m으로 요청한 결과와 일치).
+    PRESET_SAMPLING=profile이면 밴드 안에서 데이터셋 분포(분위수/범주 빈도)를 따른다.
     """
     rng = np.random.default_rng(seed)
     rnd = random.Random(seed) if seed is not None else random
-    diff = (difficulty or "normal").lower()
-    if diff not in ("easy", "normal", "hard"):
-        diff = "normal"
+    diff = normalize_difficulty(difficulty)
 
     # 각 feature의 난이도 밴드 계산 (CSV 범위 기반)
-    p_lo, p_hi = nested_band_from_api("payload_tons",   diff, invert=False)
-    d_lo, d_hi = nested_band_from_api("distance_ly",    diff, invert=False)
-    t_lo, t_hi = nested_band_from_api("duration_years", diff, invert=False)
-    f_lo, f_hi = nested_band_from_api("fuel_tons",      diff, invert=False)
+    bands = np.array([nested_band_from_api(name, diff, invert=inv) for name, inv, _ in PRESET_NUMERIC_FIELDS])
+    u = rng.random((n, len(PRESET_NUMERIC_FIELDS)))
+    values = np.column_stack([
+        band_values(name, lo, hi, u[:, j]) for j, ((name, _, _), (lo, hi)) in enumerate(zip(PRESET_NUMERIC_FIELDS, bands))
+    ]).tolist()
 
-    s_lo, s_hi = nested_band_from_api("science_pts",    diff, invert=True)
-    c_lo, c_hi = nested_band_from_api("crew_size",      diff, invert=True)
+    weights = {name: category_weights(name, choices) for name, choices in (
+        ("mission_type", MISSION_TYPES), ("target_type", TARGET_TYPES), ("launch_vehicle", LAUNCHERS))}
 
-    payload = rand_in_band(rng, p_lo, p_hi, decimals=1)
-    dist    = rand_in_band(rng, d_lo, d_hi, decimals=1)
-    dur     = rand_in_band(rng, t_lo, t_hi, decimals=1)
-    fuel    = rand_in_band(rng, f_lo, f_hi, decimals=0)
-    sci     = rand_in_band(rng, s_lo, s_hi, decimals=1)
-    crew    = int(round(rand_in_band(rng, c_lo, c_hi)))
+    def pick(api_name: str, choices: List[str]) -> str:
+        w = weights[api_name]
+        return rnd.choice(choices) if w is None else rnd.choices(choices, w)[0]
 
-    return {
-        "difficulty": diff,
-        "payload_tons": payload,
-        "mission_type": rnd.choice(MISSION_TYPES),
-        "target_type": rnd.choice(TARGET_TYPES),
-        "launch_vehicle": rnd.choice(LAUNCHERS),
-        "distance_ly": dist,
-        "duration_years": dur,
-        "science_pts": sci,
-        "crew_size": crew,
-        "fuel_tons": float(fuel),
-        "clamp_min": 0.0,
-        "clamp_max": 100.0,
-    }
+    presets = []
+    for payload, dist, dur, fuel, sci, crew in values:
+        presets.append({
+            "difficulty": diff,
+            "payload_tons": float(round(payload, 1)),
+            "mission_type": pick("mission_type", MISSION_TYPES),
+            "target_type": pick("target_type", TARGET_TYPES),
+            "launch_vehicle": pick("launch_vehicle", LAUNCHERS),
+            "distance_ly": float(round(dist, 1)),
+            "duration_years": float(round(dur, 1)),
+            "science_pts": float(round(sci, 1)),
+            "crew_size": int(round(crew)),
+            "fuel_tons": float(round(fuel, 0)),
+            "clamp_min": 0.0,
+            "clamp_max": 100.0,
+        })
+    return presets
+
+def random_preset(difficulty: str = "normal", seed: Optional[int] = None) -> dict:
+    """
+    모든 숫자 feature를 CSV min~max 범위 안에서만 생성.
+    - 큰 값일수록 어려운 지표 (invert=False): payload_tons, distance_ly, duration_years, fuel_tons
+    - 큰 값일수록 쉬운 지표 (invert=True) : science_pts, crew_size
+    난이도는 중첩(easy ⊂ normal ⊂ hard)되도록 밴드를 자른다.
+    """
+    return random_presets(difficulty, 1, seed)[0]
+
+def attach_predictions(presets: List[dict]) -> List[dict]:
+    """프리셋마다 현재 모델 예측(prediction: success_raw/success_final/is_success)을 배치 1회로 붙임"""
+    model = active_model
+    if model is None or not presets:
+        for p in presets:
+            p["prediction"] = None
+        return presets
+    cols = {name: np.array([p[name] for p in presets], dtype=float) for name in NUMERIC_INPUT_FIELDS}
+    for name in CATEGORICAL_INPUT_FIELDS:
+        cols[name] = np.array([p[name] for p in presets], dtype=object)
+    scored = score_columns(cols, model)
+    for p, raw, final, ok in zip(presets, np.round(scored["success_raw"], 4).tolist(),
+                                 np.round(scored["success_final"], 4).tolist(), scored["is_success"].tolist()):
+        p["prediction"] = {"success_raw": raw, "success_final": final, "is_success": ok}
+    return presets
+
+# 시드 없는 /preset용 프리셋 풀: 난이도별 PRESET_POOL_SIZE개를 백그라운드에서 채워 둠 (0이면 비활성)
+PRESET_POOL_SIZE = int(os.getenv("PRESET_POOL_SIZE", "0"))
+preset_pool = (
+    PresetPool(lambda diff, n: attach_predictions(random_presets(diff, n)), ("easy", "normal", "hard"),
+               size=PRESET_POOL_SIZE)
+    if PRESET_POOL_SIZE > 0 else None
+)
 
 @app.get("/preset")
 def preset(
     difficulty: str = Query(default="normal", description="easy, normal, hard 중 선택"),
     seed: Optional[int] = Query(default=None)
 ):
-    """난이도별 랜덤 초기 미션 생성 (CSV 범위 내부에서 easy ⊂ normal ⊂ hard)"""
+    """
+    난이도별 랜덤 초기 미션 생성 (CSV 범위 내부에서 easy ⊂ normal ⊂ hard)
+    프리셋 풀이 켜져 있고 seed가 없으면 풀에서 꺼내며, 모델 예측값(prediction)이 함께 붙는다.
+    seed를 주면 항상 결정적 생성 경로를 사용한다.
+    """
+    if seed is None and preset_pool is not None:
+        diff = normalize_difficulty(difficulty)
+        item = preset_pool.take(diff)
+        return item if item is not None else attach_predictions(random_presets(diff, 1))[0]
     return random_preset(difficulty, seed)
+
+@app.get("/presets")
+def presets(
+    n: int = Query(default=10, ge=1, description="생성할 프리셋 개수"),
+    difficulty: str = Query(default="normal", description="easy, normal, hard 중 선택"),
+    seed: Optional[int] = Query(default=None),
+):
+    """프리셋 n개 일괄 생성 (벡터화 샘플링, seed 주면 재현 가능)"""
+    if n > PRESETS_MAX_N:
+        raise HTTPException(status_code=422, detail=f"n must be <= {PRESETS_MAX_N}")
+    return random_presets(difficulty, n, seed)
+
+# =========================
+# 6-1) 모델 기반 난이도 밴드 보정 (목표 통과율에 맞춰 easy/normal 밴드 비율 선택, 디스크 캐시)
+# =========================
+CALIBRATE_DIFFICULTY = os.getenv("CALIBRATE_DIFFICULTY", "0") == "1"
+# 목표 통과율(success_final >= SUCCESS_THRESHOLD_PERCENT 비율). hard는 항상 전체 범위
+DIFFICULTY_TARGET_PASS = {"easy": 0.85, "normal": 0.55}
+for _item in os.getenv("DIFFICULTY_TARGET_PASS", "").split(","):
+    _name, _sep, _value = _item.partition("=")
+    if _sep and _name.strip() in DIFFICULTY_TARGET_PASS:
+        DIFFICULTY_TARGET_PASS[_name.strip()] = float(_value)
+CALIBRATION_SAMPLES = int(os.getenv("CALIBRATION_SAMPLES", "2000"))  # 비율 후보 1개당 샘플 수
+CALIBRATION_STEPS = int(os.getenv("CALIBRATION_STEPS", "20"))        # 비율 후보 개수 (1/STEPS ~ 1.0)
+CALIBRATION_PATH = os.getenv("CALIBRATION_PATH", "")                 # 비우면 <MODEL_PATH>.bands.json
+DIFFICULTY_CALIBRATION: Optional[dict] = None
+_calibration_lock = threading.Lock()
+
+def calibration_key(model: LoadedModel) -> dict:
+    """캐시 키: 모델 파일 해시 + 범위 + 임계값 + 보정 설정"""
+    return {
+        "model_version": model.version,
+        "ranges": {name: list(get_range_by_api_name(name)) for name, _, _ in PRESET_NUMERIC_FIELDS},
+        "threshold": SUCCESS_THRESHOLD_PERCENT,
+        "targets": DIFFICULTY_TARGET_PASS,
+        "samples": CALIBRATION_SAMPLES,
+        "steps": CALIBRATION_STEPS,
+        "sampling": PRESET_SAMPLING,
+        "profile": DATASET_PROFILE.get("source") if PRESET_SAMPLING == "profile" and DATASET_PROFILE else None,
+    }
+
+def calibrate_difficulty_fracs(model: LoadedModel, seed: int = 0) -> dict:
+    """
+    밴드 비율 후보 K개 × 프리셋 샘플 M개를 한 번의 배치로 평가해 비율별 통과율을 구하고,
+    easy/normal 목표 통과율에 가장 가까운 비율을 고른다 (easy ≤ normal 유지).
+    """
+    fracs = np.linspace(1.0 / CALIBRATION_STEPS, 1.0, CALIBRATION_STEPS)
+    k, m = len(fracs), CALIBRATION_SAMPLES
+    rng = np.random.default_rng(seed)
+    u = rng.random((m, len(PRESET_NUMERIC_FIELDS)))
+
+    cols: Dict[str, np.ndarray] = {}
+    for j, (name, invert, _) in enumerate(PRESET_NUMERIC_FIELDS):
+        lo, hi = get_range_by_api_name(name)
+        width = fracs[:, None] * (hi - lo)   # (K, 1): 밴드 [lo, lo+f*span] (invert면 [hi-f*span, hi])
+        if invert:
+            cols[name] = band_values(name, hi - width, hi, 1.0 - u[None, :, j]).ravel()
+        else:
+            cols[name] = band_values(name, lo, lo + width, u[None, :, j]).ravel()
+    for name, choices in (("mission_type", MISSION_TYPES), ("target_type", TARGET_TYPES),
+                          ("launch_vehicle", LAUNCHERS)):
+        weights = category_weights(name, choices)
+        picks = rng.choice(len(choices), m, p=weights) if weights is not None else rng.integers(0, len(choices), m)
+        cols[name] = np.tile(np.array(choices, dtype=object)[picks], k)
+    cols["clamp_min"] = np.zeros(k * m)
+    cols["clamp_max"] = np.full(k * m, 100.0)
+
+    rates = score_columns(cols, model)["is_success"].reshape(k, m).mean(axis=1)
+
+    def pick(target: float, min_frac: float) -> int:
+        allowed = np.flatnonzero(fracs >= min_frac)
+        err = np.abs(rates[allowed] - target)
+        return int(allowed[np.flatnonzero(err == err.min())[-1]])  # 동률이면 넓은 밴드
+
+    i_easy = pick(DIFFICULTY_TARGET_PASS["easy"], 0.0)
+    i_normal = pick(DIFFICULTY_TARGET_PASS["normal"], fracs[i_easy])
+    return {
+        "fracs": {"easy": round(float(fracs[i_easy]), 6), "normal": round(float(fracs[i_normal]), 6), "hard": 1.0},
+        "pass_rates": {"easy": float(rates[i_easy]), "normal": float(rates[i_normal]), "hard": float(rates[-1])},
+        "targets": dict(DIFFICULTY_TARGET_PASS),
+    }
+
+def load_or_calibrate_difficulty(model: LoadedModel) -> dict:
+    """디스크 캐시(같은 키)가 있으면 읽고, 없으면 보정 후 저장"""
+    path = CALIBRATION_PATH or f"{model.path}.bands.json"
+    key = calibration_key(model)
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == json.loads(json.dumps(key)):
+            return cached["result"]
+    except (OSError, ValueError):
+        pass
+
+    t0 = time.perf_counter()
+    result = calibrate_difficulty_fracs(model)
+    try:
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "result": result}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[WARN] Could not save difficulty calibration to '{path}': {e}")
+    print(f"[INFO] Calibrated difficulty bands in {time.perf_counter() - t0:.2f}s: {result}")
+    return result
+
+def refresh_difficulty_calibration() -> None:
+    """현재 모델 기준으로 난이도 밴드 보정 후 DIFFICULTY_FRACS 교체 (백그라운드 스레드)"""
+    global DIFFICULTY_FRACS, DIFFICULTY_CALIBRATION
+    with _calibration_lock:
+        model = active_model
+        if model is None:
+            return
+        try:
+            result = load_or_calibrate_difficulty(model)
+        except Exception as e:
+            print(f"[WARN] Could not calibrate difficulty bands: {e}")
+            return
+        DIFFICULTY_FRACS = dict(result["fracs"])
+        DIFFICULTY_CALIBRATION = {"model_version": model.version, **result}
+        if preset_pool is not None:
+            preset_pool.clear()  # 밴드가 바뀌었으므로 이전 밴드로 만든 프리셋 폐기
+
+def start_difficulty_calibration() -> None:
+    if CALIBRATE_DIFFICULTY:
+        threading.Thread(target=refresh_difficulty_calibration, daemon=True, name="difficulty-calibration").start()
+
+# =========================
+# 7) 모델/범위 핫 리로드 (백그라운드 로드 → 워밍업 → 원자적 교체)
+# =========================
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # /admin/reload에 필요한 X-Admin-Token 값 (비우면 엔드포인트 비활성)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))  # 초, 0이면 파일 감시 끔
+LAST_RELOAD: Optional[dict] = None
+_reload_lock = threading.Lock()
+
+def reload_model_and_ranges(model: bool = True, ranges: bool = True) -> dict:
+    """
+    새 모델/범위 파일을 지역 변수로 읽고, 새 모델은 새 범위로 클램프한 입력으로 워밍업한 뒤
+    모델·범위 교체와 캐시 비우기를 한꺼번에 한다. 로드 중에도 기존 모델·범위로 요청을 계속 처리하고,
+    요청한 항목 중 하나라도 실패하면 아무것도 바꾸지 않는다 (새 범위 + 옛 모델 같은 조합이 보이지 않도록).
+    """
+    global active_model, FEATURE_RANGES, DATASET_PROFILE, LAST_RELOAD
+    with _reload_lock:
+        t0 = time.perf_counter()
+        result = {"model_reloaded": False, "ranges_reloaded": False, "errors": []}
+
+        new_ranges, new_profile = FEATURE_RANGES, DATASET_PROFILE
+        if ranges:
+            try:
+                new_ranges, new_profile = read_range_source()
+            except Exception as e:
+                result["errors"].append(f"ranges: {e}")
+
+        new_model = active_model
+        if model and not result["errors"]:
+            new_model = load_active_model(MODEL_PATH)
+            if new_model is None:
+                result["errors"].append(f"model: could not load from {MODEL_PATH}")
+            else:
+                try:
+                    features, _ = mission_features(MissionInput(payload_tons=10.0), ranges=new_ranges)
+                    new_model.predict_one(features)  # 워밍업 + 동작 확인 (새 범위 기준 입력)
+                except Exception as e:
+                    result["errors"].append(f"model warmup: {e}")
+
+        if not result["errors"] and (model or ranges):
+            active_model, FEATURE_RANGES, DATASET_PROFILE = new_model, new_ranges, new_profile
+            prediction_cache.clear()  # 교체 직후 (이전 세대로 계산 중인 값은 put에서 버려짐)
+            result["model_reloaded"], result["ranges_reloaded"] = model, ranges
+            if preset_pool is not None:
+                preset_pool.clear()
+            start_response_surface_refresh()
+            start_difficulty_calibration()
+
+        result["model_version"] = active_model.version if active_model is not None else None
+        result["seconds"] = round(time.perf_counter() - t0, 4)
+        LAST_RELOAD = result
+        print(f"[INFO] Reload finished: {result}")
+        return result
+
+@app.post("/admin/reload")
+async def admin_reload(
+    model: bool = Query(default=True, description="모델 파일 다시 읽기"),
+    ranges: bool = Query(default=True, description="범위 CSV 다시 읽기"),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """모델/범위 핫 리로드 (워커 스레드에서 수행, 다른 요청은 막지 않음). ADMIN_TOKEN이 없으면 404."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+    return await run_in_threadpool(reload_model_and_ranges, model, ranges)
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def watch_model_files(interval: float) -> None:
+    """MODEL_PATH / 범위 파일(DATASET_PROFILE_PATH 또는 CSV_RANGE_PATH)의 mtime이 바뀌면 해당 항목만 리로드"""
+    last_model, last_ranges = _file_mtime(MODEL_PATH), _file_mtime(range_source_path())
+    while True:
+        time.sleep(interval)
+        cur_model, cur_ranges = _file_mtime(MODEL_PATH), _file_mtime(range_source_path())
+        model_changed = cur_model is not None and cur_model != last_model
+        ranges_changed = cur_ranges is not None and cur_ranges != last_ranges
+        last_model, last_ranges = cur_model, cur_ranges
+        if model_changed or ranges_changed:
+            try:
+                reload_model_and_ranges(model=model_changed, ranges=ranges_changed)
+            except Exception as e:
+                print(f"[WARN] Model file watcher reload failed: {e}")
+
+if MODEL_WATCH_INTERVAL > 0:
+    threading.Thread(
+        target=watch_model_files, args=(MODEL_WATCH_INTERVAL,), daemon=True, name="model-watcher",
+    ).start()
+
+# 서버 기동 시 응답 곡면 준비 (RESPONSE_SURFACE=1일 때만, 준비 전에는 approx도 exact로 처리)
+start_response_surface_refresh()
+# 서버 기동 시 난이도 밴드 보정 (CALIBRATE_DIFFICULTY=1일 때만, 끝나기 전에는 고정 비율 사용)
+start_difficulty_calibration()
+# 프리셋 풀 채우기 시작 (PRESET_POOL_SIZE > 0일 때만)
+if preset_pool is not None:
+    preset_pool.start()
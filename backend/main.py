@@ -8,6 +8,8 @@ from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
+from fast_predict import build_fast_predictor
+
 # =========================
 # 0) 서버 & CORS
 # =========================
@@ -39,6 +41,20 @@ except Exception as e:
     pipe = None
     print(f"[WARN] Could not load model from '{MODEL_PATH}': {e}")
 
+# 단일 행 고속 경로 (pandas 미사용). 파이프라인 구조를 모르면 None → 기존 DataFrame 경로
+MODEL_FEATURE_COLUMNS = [
+    "Mission Type",
+    "Target Type",
+    "Launch Vehicle",
+    "Distance from Earth (light-years)",
+    "Mission Duration (years)",
+    "Scientific Yield (points)",
+    "Crew Size",
+    "Fuel Consumption (tons)",
+]
+FAST_PREDICT = os.getenv("FAST_PREDICT", "1") != "0"
+fast_predictor = build_fast_predictor(pipe, MODEL_FEATURE_COLUMNS) if FAST_PREDICT else None
+
 # =========================
 # 1-1) CSV 기반 feature 범위 로드 & 유틸
 # =========================
@@ -172,8 +188,10 @@ def predict(m: MissionInput):
         "Fuel Consumption (tons)": float(fuel),
     }
 
-    X = pd.DataFrame([features])
-    success_raw = float(pipe.predict(X)[0])
+    success_raw = fast_predictor.predict_one(features) if fast_predictor is not None else None
+    if success_raw is None:
+        X = pd.DataFrame([features])
+        success_raw = float(pipe.predict(X)[0])
 
     # (D) 페널티 및 최종 성공률 클립 (0~100)
     penalty = 0.4 * payload
@@ -0,0 +1,180 @@
+"""
+지연 시간 계측 & Prometheus 텍스트 노출 (/metrics)
+
+- Histogram: 고정 버킷 히스토그램 (bisect 1회 + 카운터 증가)
+- MetricsRegistry: 카운터/히스토그램 모음, render()로 Prometheus text format(0.0.4) 출력
+- StageTimer: 요청 1건의 단계별 경과 시간을 mark(stage)마다 히스토그램에 기록
+- MetricsMiddleware: 엔드포인트별 요청 수/에러 수/전체 지연 (순수 ASGI, 꺼져 있으면 등록하지 않음,
+  SHED_HEADER가 붙은 부하 차단 503은 에러로 세지 않음)
+
+계측을 끄면(METRICS=0) 미들웨어를 등록하지 않고 타이머도 None이므로 핫 패스에는 `if timer` 검사만 남는다.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 승인 제어가 의도적으로 거절한 503에 붙이는 응답 헤더. 이 헤더가 있는 응답은 errors_total에 세지 않는다
+# (거절 수는 admission_shed_total에 따로 집계되므로, 부하 차단이 정상 동작할 때 에러율이 튀지 않도록)
+SHED_HEADER = "X-Load-Shed"
+_SHED_HEADER_KEY = SHED_HEADER.lower().encode("latin-1")
+
+# 1µs ~ 2.5s (단일 행 추론 단계부터 큰 배치 요청까지)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸 = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "space_mission", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._help: Dict[str, str] = {}
+        # render() 시점에 값을 읽어오는 게이지/카운터 (캐시 통계 등)
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(value)
+
+    def add_collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]) -> None:
+        """fn() → (이름, 타입 "gauge"|"counter", 설명, 라벨, 값) 목록"""
+        self._collectors.append(fn)
+
+    def timer(self) -> "StageTimer":
+        return StageTimer(self)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        typed = set()
+
+        def header(name: str, kind: str, help_text: Optional[str] = None) -> None:
+            if name in typed:
+                return
+            typed.add(name)
+            lines.append(f"# HELP {name} {help_text or self._help.get(name, name)}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                ((k, (list(h.counts), h.sum, h.count)) for k, h in self._histograms.items()),
+                key=lambda item: item[0],
+            )
+
+        for (name, labels), value in counters:
+            full = f"{self.prefix}_{name}"
+            header(full, "counter", self._help.get(name))
+            lines.append(f"{full}{_labels(labels)} {value:g}")
+
+        for (name, labels), (counts, total, count) in histograms:
+            full = f"{self.prefix}_{name}"
+            header(full, "histogram", self._help.get(name))
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{full}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{full}_sum{_labels(labels)} {total:.9g}")
+            lines.append(f"{full}_count{_labels(labels)} {count}")
+
+        for fn in self._collectors:
+            for name, kind, help_text, labels, value in fn():
+                full = f"{self.prefix}_{name}"
+                header(full, kind, help_text)
+                lines.append(f"{full}{_labels(tuple(sorted(labels.items())))} {float(value):g}")
+
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """요청 1건용. mark(stage) 호출 사이의 경과 시간을 stage 라벨로 기록."""
+
+    __slots__ = ("registry", "last")
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.registry.observe("predict_stage_seconds", now - self.last, stage=stage)
+        self.last = now
+
+
+class MetricsMiddleware:
+    """엔드포인트별 요청 수/5xx·예외 수/전체 지연 (라우트에 없는 경로는 "other"로 묶음, SHED_HEADER 응답은 에러 아님)"""
+
+    def __init__(self, app, registry: MetricsRegistry, route_paths: Callable[[], Iterable[str]]):
+        self.app = app
+        self.registry = registry
+        self._route_paths = route_paths
+        self._known: Optional[set] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self._known is None:
+            self._known = set(self._route_paths())
+        path = scope.get("path", "")
+        endpoint = path if path in self._known else "other"
+        status = {"code": 500, "shed": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["shed"] = any(k.lower() == _SHED_HEADER_KEY for k, _ in message.get("headers", ()))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            self.registry.inc("errors_total", endpoint=endpoint)
+            raise
+        finally:
+            self.registry.inc("requests_total", endpoint=endpoint)
+            self.registry.observe("request_seconds", time.perf_counter() - start, endpoint=endpoint)
+        if status["code"] >= 500 and not status["shed"]:
+            self.registry.inc("errors_total", endpoint=endpoint)
@@ -0,0 +1,91 @@
+"""
+동시 /predict 요청 묶음 처리 (asyncio micro-batching)
+
+동시에 들어온 요청의 features를 큐에 모았다가 최대 max_batch건 / max_wait_ms 단위로
+한 번의 배치 추론(워커 스레드)으로 처리하고, 각 요청에 자기 결과를 돌려준다.
+- 배치 추론이 진행되는 동안 쌓인 요청은 다음 배치로 자연스럽게 묶인다.
+- 한가할 때(직전 배치가 1건)는 대기 없이 바로 처리하므로 단일 요청 지연은 그대로다.
+"""
+import asyncio
+from typing import Callable, List, Optional, Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn: Callable[[List[dict]], Sequence[float]],
+                 max_batch: int = 64, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_batch_size = 0
+        self.batches = 0
+        self.items = 0
+        self.max_seen = 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        # 이벤트 루프가 바뀌면(테스트 클라이언트 등) 큐/작업을 새로 만든다
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, features: dict) -> float:
+        """features 1건을 큐에 넣고 배치 결과 중 자기 값을 기다림"""
+        queue = self._ensure_started()
+        fut = self._loop.create_future()
+        queue.put_nowait((features, fut))
+        return await fut
+
+    async def _collect(self, queue: asyncio.Queue) -> list:
+        batch = [await queue.get()]
+        # 부하 중(직전 배치가 2건 이상)일 때만 max_wait 동안 더 모은다
+        wait = self.max_wait if self._last_batch_size > 1 else 0.0
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            wait = 0.0
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = await self._collect(queue)
+            self._last_batch_size = len(batch)
+            self.batches += 1
+            self.items += len(batch)
+            self.max_seen = max(self.max_seen, len(batch))
+
+            rows = [features for features, _ in batch]
+            try:
+                results = await run_in_threadpool(self.predict_fn, rows)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), raw in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(float(raw))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "max_batch_seen": self.max_seen,
+        }
@@ -0,0 +1,212 @@
+"""
+다중 모델 레지스트리 (/predict?model=..., 가중치 A/B 분배, 섀도 채점)
+
+- 기본 모델("default")은 level.py의 active_model(MODEL_PATH, 핫 리로드 대상)을 그대로 쓰고 항상 상주
+- 그 밖의 버전은 MODEL_REGISTRY="이름=경로,..."로 등록, 처음 요청될 때 로드하고
+  기본 모델을 포함해 최대 max_resident개까지만 LRU로 메모리에 유지
+  (max_resident=1이면 등록 모델은 요청마다 로드하고 바로 내보냄)
+- split: 요청에 model이 없을 때 가중치대로 모델 선택 (예: default=90,candidate=10)
+- shadow: 응답에 쓴 모델과 별개로 같은 입력(클램프·무게 효과까지 끝난 features)을
+  다른 모델로 백그라운드 스레드에서 채점해 차이만 기록 (큐가 차면 버림 → 요청 경로에 영향 없음)
+- 모델별 요청 수/행 수/에러 수/누적 지연, 섀도 모델은 섀도 채점 횟수/지연/차이를 따로 집계
+"""
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from model_store import LoadedModel
+
+
+def parse_pairs(spec: str) -> Dict[str, str]:
+    """'a=x,b=y' → {"a": "x", "b": "y"} (빈 항목/이름 없는 항목은 무시)"""
+    pairs: Dict[str, str] = {}
+    for item in (spec or "").split(","):
+        name, sep, value = item.partition("=")
+        if sep and name.strip() and value.strip():
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+class ModelStats:
+    def __init__(self):
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.shadow_batches = 0
+        self.shadow_rows = 0
+        self.shadow_errors = 0
+        self.shadow_seconds = 0.0
+        self.shadow_abs_diff_sum = 0.0
+        self.shadow_abs_diff_max = 0.0
+
+    def as_dict(self) -> dict:
+        out = {
+            "requests": self.requests,
+            "rows": self.rows,
+            "errors": self.errors,
+            "avg_ms": round(self.seconds / self.requests * 1000.0, 4) if self.requests else 0.0,
+        }
+        if self.shadow_batches or self.shadow_errors:
+            out["shadow"] = {
+                "batches": self.shadow_batches,
+                "rows": self.shadow_rows,
+                "errors": self.shadow_errors,
+                "avg_ms": round(self.shadow_seconds / self.shadow_batches * 1000.0, 4) if self.shadow_batches else 0.0,
+                "mean_abs_diff": round(self.shadow_abs_diff_sum / self.shadow_rows, 6) if self.shadow_rows else 0.0,
+                "max_abs_diff": round(self.shadow_abs_diff_max, 6),
+            }
+        return out
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        paths: Dict[str, str],
+        loader: Callable[[str], Optional[LoadedModel]],
+        default_getter: Callable[[], Optional[LoadedModel]],
+        columns: Sequence[str],
+        default_name: str = "default",
+        max_resident: int = 2,
+        split: Optional[Dict[str, float]] = None,
+        shadow: Optional[str] = None,
+        shadow_queue_size: int = 64,
+    ):
+        self.default_name = default_name
+        self.paths = {k: v for k, v in paths.items() if k != default_name}
+        self.columns = list(columns)
+        self.max_resident = max(1, int(max_resident))
+        self._loader = loader
+        self._default_getter = default_getter
+        self._resident: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in self.paths}
+        self._stats: Dict[str, ModelStats] = {name: ModelStats() for name in self.names()}
+        self.loads = 0
+        self.evictions = 0
+
+        split = {k: w for k, w in (split or {}).items() if w > 0 and k in self._stats}
+        self._split_names = list(split)
+        self._split_cum = np.cumsum([split[k] for k in self._split_names]) if split else None
+
+        self.shadow = shadow if shadow in self._stats else None
+        self.shadow_dropped = 0
+        self._shadow_queue: "queue.Queue" = queue.Queue(maxsize=max(1, shadow_queue_size))
+        if self.shadow is not None:
+            threading.Thread(target=self._shadow_worker, daemon=True, name="shadow-scorer").start()
+
+    def names(self) -> List[str]:
+        return [self.default_name] + list(self.paths)
+
+    def get(self, name: str) -> Optional[LoadedModel]:
+        """이름 → LoadedModel (필요하면 로드, LRU 갱신). 알 수 없는 이름이면 KeyError, 로드 실패면 None."""
+        if name == self.default_name:
+            return self._default_getter()
+        if name not in self.paths:
+            raise KeyError(name)
+        with self._lock:
+            model = self._resident.get(name)
+            if model is not None:
+                self._resident.move_to_end(name)
+                return model
+        with self._load_locks[name]:  # 같은 모델을 동시에 두 번 로드하지 않도록
+            with self._lock:
+                model = self._resident.get(name)
+            if model is None:
+                model = self._loader(self.paths[name])
+                if model is None:
+                    return None
+                with self._lock:
+                    self.loads += 1
+                    self._resident[name] = model
+                    while len(self._resident) > self.max_resident - 1:  # 기본 모델이 한 자리 차지
+                        evicted, _ = self._resident.popitem(last=False)
+                        self.evictions += 1
+                        print(f"[INFO] Model registry evicted '{evicted}'")
+            else:
+                with self._lock:
+                    self._resident.move_to_end(name)
+            return model
+
+    def choose(self) -> str:
+        """split 가중치대로 모델 이름 선택 (split이 없으면 기본 모델)"""
+        if self._split_cum is None:
+            return self.default_name
+        r = random.random() * self._split_cum[-1]
+        return self._split_names[int(np.searchsorted(self._split_cum, r, side="right"))]
+
+    def record(self, name: str, rows: int, seconds: float, error: bool = False) -> None:
+        stats = self._stats.get(name)
+        if stats is None:
+            return
+        with self._lock:
+            stats.requests += 1
+            stats.rows += rows
+            stats.seconds += seconds
+            if error:
+                stats.errors += 1
+
+    def submit_shadow(self, primary_name: str, X, primary_raw: Sequence[float]) -> bool:
+        """
+        섀도 채점 예약. X는 모델 입력 DataFrame 또는 features dict 목록(DataFrame 변환도 백그라운드에서).
+        섀도가 꺼져 있거나 응답 모델이 섀도 모델이면 무시, 큐가 차면 버림.
+        """
+        if self.shadow is None or primary_name == self.shadow:
+            return False
+        try:
+            self._shadow_queue.put_nowait((X, np.asarray(primary_raw, dtype=float)))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.shadow_dropped += 1
+            return False
+
+    def _shadow_worker(self) -> None:
+        while True:
+            X, primary_raw = self._shadow_queue.get()
+            t0 = time.perf_counter()
+            try:
+                model = self.get(self.shadow)
+                if model is None:
+                    raise RuntimeError(f"could not load shadow model '{self.shadow}'")
+                X = X[self.columns] if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=self.columns)
+                shadow_raw = np.asarray(model.predict_frame(X), dtype=float)
+            except Exception as e:
+                print(f"[WARN] Shadow scoring failed: {e}")
+                with self._lock:
+                    self._stats[self.shadow].shadow_errors += 1
+                continue
+            diff = np.abs(shadow_raw - primary_raw)
+            stats = self._stats[self.shadow]
+            with self._lock:
+                stats.shadow_seconds += time.perf_counter() - t0
+                stats.shadow_batches += 1
+                stats.shadow_rows += int(diff.size)
+                stats.shadow_abs_diff_sum += float(diff.sum())
+                stats.shadow_abs_diff_max = max(stats.shadow_abs_diff_max, float(diff.max(initial=0.0)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            resident = [self.default_name] + list(self._resident)
+            per_model = {name: s.as_dict() for name, s in self._stats.items()}
+            split = None
+            if self._split_cum is not None:
+                weights = np.diff(np.concatenate([[0.0], self._split_cum]))
+                split = {n: round(float(w / self._split_cum[-1]), 4) for n, w in zip(self._split_names, weights)}
+            return {
+                "models": self.names(),
+                "resident": resident,
+                "max_resident": self.max_resident,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "split": split,
+                "shadow": self.shadow,
+                "shadow_dropped": self.shadow_dropped,
+                "per_model": per_model,
+            }
@@ -0,0 +1,306 @@
+"""
+로드된 모델 묶음 (LoadedModel)
+
+joblib 모델과 거기서 파생된 추론 경로(배열 기반 포레스트 엔진, 단일 행 고속 경로),
+버전(파일 해시)/로드 시각/로드 시간을 한 객체로 묶는다.
+핫 리로드 시에는 새 LoadedModel을 만들어 전역 참조 하나만 바꿔치기하므로
+요청은 항상 한 버전의 모델만 보게 된다.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compiled_forest import CompiledForest, CompiledPipeline, compile_pipeline
+from fast_predict import FastRowPredictor, build_fast_predictor
+from tree_explainer import PathExplainer, build_path_explainer
+
+
+def file_version(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용 sha256 앞 12자리 (모델 버전 표기용)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+class LoadedModel:
+    def __init__(
+        self,
+        pipe,
+        path: str,
+        columns: Sequence[str],
+        version: str,
+        load_seconds: float,
+        compiled: Optional[CompiledPipeline] = None,
+        fast: Optional[FastRowPredictor] = None,
+        storage: str = "memory",
+    ):
+        self.pipe = pipe
+        self.path = path
+        self.columns = list(columns)
+        self.version = version
+        self.load_seconds = load_seconds
+        self.loaded_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.compiled = compiled
+        self.fast = fast
+        self.storage = storage  # "memory" | "mmap"(포레스트 배열을 워커 간 공유)
+        self._per_tree: Optional[CompiledPipeline] = compiled
+        self._per_tree_checked = compiled is not None
+        self._explainer: Optional[PathExplainer] = None
+        self._explainer_checked = False
+        self._lazy_lock = threading.RLock()  # 첫 요청들이 동시에 와도 변환/설명기 준비는 한 번만
+        self._subsets = {}
+
+    @property
+    def engine(self) -> str:
+        return "compiled" if self.compiled is not None else "sklearn"
+
+    def predict_frame(self, X: pd.DataFrame) -> np.ndarray:
+        """DataFrame 배치 예측. compiled 엔진이 있으면 전처리 후 배열 엔진으로 평가."""
+        if self.compiled is not None:
+            return self.compiled.predict(X)
+        return np.asarray(self.pipe.predict(X), dtype=float)
+
+    def predict_rows(self, rows: List[dict]) -> np.ndarray:
+        """features dict 목록 배치 예측"""
+        return self.predict_frame(pd.DataFrame(rows, columns=self.columns))
+
+    def predict_one(self, features: dict, timer=None) -> float:
+        """
+        features dict 1건 예측. 고속 경로가 가능하면 사용, 아니면 pd.DataFrame 경로.
+        timer(StageTimer)를 주면 입력 구성(encode/dataframe)과 모델 평가(model) 시간을 기록.
+        """
+        if self.fast is not None:
+            row = self.fast.encode_row(features)
+            if row is not None:
+                if timer:
+                    timer.mark("encode")
+                raw = float(self.fast.estimator.predict(row)[0])
+                if timer:
+                    timer.mark("model")
+                return raw
+        X = pd.DataFrame([features])
+        if timer:
+            timer.mark("dataframe")
+        raw = float(self.predict_frame(X)[0])
+        if timer:
+            timer.mark("model")
+        return raw
+
+    def per_tree_pipeline(self) -> Optional[CompiledPipeline]:
+        """
+        트리별 예측용 CompiledPipeline. compiled 엔진이면 그대로, sklearn 엔진이면 처음 필요할 때 변환해 둔다.
+        트리 앙상블로 변환할 수 없는 모델이면 None.
+        """
+        if not self._per_tree_checked:
+            with self._lazy_lock:
+                if not self._per_tree_checked:
+                    self._per_tree = compile_pipeline(self.pipe)
+                    self._per_tree_checked = True
+        return self._per_tree
+
+    def predict_per_tree(self, X: pd.DataFrame) -> Optional[np.ndarray]:
+        """트리별 예측값 shape = (n_trees, n_rows). 모든 트리를 배열 순회 한 번으로 평가. 지원하지 않으면 None."""
+        compiled = self.per_tree_pipeline()
+        if compiled is None:
+            return None
+        return compiled.forest.predict_per_tree(compiled.transform(X))
+
+    def subset_forest(self, n_trees: int) -> Optional[CompiledForest]:
+        """앞쪽 n_trees개 트리만 쓰는 포레스트 (과부하 시 저비용 추정용). 트리 앙상블이 아니면 None."""
+        forest = self._subsets.get(n_trees)
+        if forest is None:
+            compiled = self.per_tree_pipeline()
+            if compiled is None:
+                return None
+            forest = self._subsets[n_trees] = compiled.forest.head(n_trees)
+        return forest
+
+    def predict_subset_one(self, features: dict, n_trees: int) -> Optional[float]:
+        """
+        features dict 1건을 앞쪽 n_trees개 트리 평균으로 예측.
+        과부하 중 이벤트 루프에서 바로 부르므로 고속 경로 인코딩이 가능할 때만 (전처리기/DataFrame 경로 없음), 아니면 None.
+        """
+        forest = self.subset_forest(n_trees)
+        row = self.fast.encode_row(features) if forest is not None and self.fast is not None else None
+        if row is None:
+            return None
+        return float(forest.predict(row)[0])
+
+    def explainer(self) -> Optional[PathExplainer]:
+        """트리 경로 기여도 설명기 (처음 필요할 때 또는 load_model(explain=True) 시 노드별 값을 미리 계산)"""
+        if not self._explainer_checked:
+            with self._lazy_lock:
+                if not self._explainer_checked:
+                    compiled = self.per_tree_pipeline()
+                    fast = self.fast
+                    if fast is None and compiled is not None:
+                        fast = build_fast_predictor(compiled, self.columns)
+                    self._explainer = build_path_explainer(
+                        compiled.forest if compiled is not None else None,
+                        fast.output_owners(self.columns) if fast is not None else None,
+                        self.columns,
+                    )
+                    self._explainer_checked = True
+        return self._explainer
+
+    def explain_frame(self, X: pd.DataFrame) -> Optional[tuple]:
+        """DataFrame 배치 → (예측값, 입력 컬럼별 기여도 (n, len(columns)+1), bias). 지원하지 않으면 None."""
+        explainer = self.explainer()
+        if explainer is None:
+            return None
+        raw, contrib = explainer.explain(self.per_tree_pipeline().transform(X))
+        return raw, contrib, explainer.bias
+
+    def explain_one(self, features: dict) -> Optional[tuple]:
+        """features dict 1건 → (예측값, 기여도 (len(columns)+1,), bias). 고속 경로 인코딩이 가능하면 DataFrame 없이 처리."""
+        explainer = self.explainer()
+        if explainer is None:
+            return None
+        row = self.fast.encode_row(features) if self.fast is not None else None
+        if row is None:
+            return tuple(v[0] if isinstance(v, np.ndarray) else v
+                         for v in self.explain_frame(pd.DataFrame([features], columns=self.columns)))
+        raw, contrib = explainer.explain(row)
+        return float(raw[0]), contrib[0], explainer.bias
+
+    def info(self) -> dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "engine": self.engine,
+            "fast_path": self.fast is not None,
+            "storage": self.storage,
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 4),
+        }
+
+
+def mmap_dir_for(path: str) -> str:
+    """모델 파일 옆 mmap 사이드카 디렉터리 경로"""
+    return f"{path}.mmap"
+
+
+def _source_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"source_size": st.st_size, "source_mtime_ns": st.st_mtime_ns}
+
+
+def export_mmap_model(path: str, sidecar: Optional[str] = None) -> Optional[str]:
+    """
+    모델 파일을 mmap 가능한 사이드카로 변환:
+      preprocess.joblib (전처리 파이프라인, 작음) + 포레스트 평탄 배열 *.npy + meta.json
+    sklearn Tree는 언피클 시 노드 배열을 자체 메모리로 복사하므로 joblib mmap_mode만으로는
+    워커 간 공유가 안 된다. 그래서 평가에 필요한 배열만 따로 .npy로 둔다.
+    변환할 수 없는 모델이면 None.
+    """
+    sidecar = sidecar or mmap_dir_for(path)
+    pipe = joblib.load(path)
+    compiled = compile_pipeline(pipe)
+    if compiled is None:
+        return None
+
+    # 여러 워커가 동시에 만들 수 있으므로 임시 디렉터리에 쓰고 rename으로 교체
+    tmp = f"{sidecar}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    compiled.forest.save(tmp)
+    if compiled.preprocess is not None:
+        joblib.dump(compiled.preprocess, os.path.join(tmp, "preprocess.joblib"))
+    meta = {"version": file_version(path), "has_preprocess": compiled.preprocess is not None, **_source_stamp(path)}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    if _read_mmap_meta(path, sidecar) is not None:
+        shutil.rmtree(tmp, ignore_errors=True)  # 다른 워커가 먼저 만든 사이드카 사용
+        return sidecar
+    shutil.rmtree(sidecar, ignore_errors=True)  # 오래된 사이드카
+    try:
+        os.rename(tmp, sidecar)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return sidecar
+
+
+def _read_mmap_meta(path: str, sidecar: str) -> Optional[dict]:
+    """사이드카가 현재 모델 파일(크기/mtime)과 일치하면 meta, 아니면 None"""
+    try:
+        with open(os.path.join(sidecar, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stamp = _source_stamp(path)
+    if any(meta.get(k) != v for k, v in stamp.items()):
+        return None
+    return meta
+
+
+def load_mmap_model(path: str, columns: Sequence[str], fast: bool = True) -> Optional[LoadedModel]:
+    """
+    사이드카(없거나 오래되면 생성)에서 포레스트 배열을 메모리 매핑으로 로드.
+    워커들은 OS 페이지 캐시를 공유하고, 콜드 스타트는 대부분 페이지 폴트로 끝난다.
+    포레스트로 변환할 수 없는 모델이면 None(=호출 측에서 일반 로드).
+    """
+    t0 = time.perf_counter()
+    sidecar = mmap_dir_for(path)
+    meta = _read_mmap_meta(path, sidecar)
+    if meta is None:
+        if export_mmap_model(path, sidecar) is None:
+            return None
+        meta = _read_mmap_meta(path, sidecar)
+        if meta is None:
+            return None
+
+    forest = CompiledForest.load(sidecar, mmap=True)
+    preprocess = joblib.load(os.path.join(sidecar, "preprocess.joblib")) if meta.get("has_preprocess") else None
+    compiled = CompiledPipeline(preprocess, forest)
+    fast_predictor = build_fast_predictor(compiled, columns) if fast else None
+    return LoadedModel(compiled, path, columns, meta["version"], time.perf_counter() - t0,
+                       compiled, fast_predictor, storage="mmap")
+
+
+def load_model(path: str, columns: Sequence[str], engine: str = "sklearn", fast: bool = True,
+               mmap: bool = False, explain: bool = False) -> LoadedModel:
+    """
+    모델 파일을 읽어 LoadedModel 생성 (실패 시 예외).
+    engine="compiled"면 배열 기반 엔진을, fast=True면 단일 행 고속 경로를 함께 준비.
+    mmap=True면 mmap 사이드카로 로드(배열 기반 엔진 사용). 변환할 수 없으면 일반 로드.
+    explain=True면 트리 경로 기여도 설명기의 노드별 값도 미리 계산.
+    """
+    model = _load_model(path, columns, engine, fast, mmap)
+    if explain:
+        t0 = time.perf_counter()
+        model.explainer()
+        model.load_seconds += time.perf_counter() - t0  # 로드 로그/info()의 load_seconds에 포함
+    return model
+
+
+def _load_model(path: str, columns: Sequence[str], engine: str, fast: bool, mmap: bool) -> LoadedModel:
+    if mmap:
+        try:
+            model = load_mmap_model(path, columns, fast=fast)
+        except Exception as e:
+            print(f"[WARN] mmap load failed for '{path}': {e}")
+            model = None
+        if model is not None:
+            return model
+        print(f"[WARN] Could not memory-map model '{path}'; loading it in memory")
+
+    t0 = time.perf_counter()
+    pipe = joblib.load(path)
+    compiled = compile_pipeline(pipe) if engine == "compiled" else None
+    fast_predictor = build_fast_predictor(
+        pipe, columns,
+        estimator=compiled.forest if compiled is not None else None,
+    ) if fast else None
+    version = file_version(path) if os.path.isfile(path) else "unknown"
+    return LoadedModel(pipe, path, columns, version, time.perf_counter() - t0, compiled, fast_predictor)
@@ -0,0 +1,110 @@
+"""
+예측 결과 LRU 캐시
+
+/predict 요청은 clamp_by_api_name 이후 같은 feature 조합으로 반복되는 경우가 많다
+(슬라이더 재전송, 프리셋 재생 등). 최종 features dict를 키로 success_raw를 캐시해
+포레스트 평가를 건너뛴다.
+- 크기 제한(LRU 축출), TTL(초, 0이면 무제한)
+- feature별 양자화 간격(예: 연료 1톤 단위)을 주면 그 간격 안의 값은 같은 키로 취급
+- 모델 교체 시 clear()로 비움
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+
+def parse_quantization(spec: str) -> Dict[str, float]:
+    """'Crew Size=1,Fuel Consumption (tons)=5' → {"Crew Size": 1.0, ...} (잘못된 항목은 무시)"""
+    steps: Dict[str, float] = {}
+    for item in (spec or "").split(","):
+        name, sep, step = item.rpartition("=")
+        if not sep:
+            continue
+        try:
+            value = float(step)
+        except ValueError:
+            continue
+        if value > 0:
+            steps[name.strip()] = value
+    return steps
+
+
+class PredictionCache:
+    """스레드 안전한 LRU + TTL 캐시 (키: 모델 입력 컬럼 순서의 값 튜플)"""
+
+    def __init__(self, columns: Sequence[str], max_size: int = 4096, ttl_seconds: float = 0.0,
+                 quantization: Optional[Dict[str, float]] = None):
+        self.columns = list(columns)
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        quantization = quantization or {}
+        self._steps = [quantization.get(c) for c in self.columns]
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.generation = 0  # clear()마다 증가 → 교체 전 모델로 계산된 값이 뒤늦게 들어오는 것 방지
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def make_key(self, features: dict) -> tuple:
+        return tuple(
+            features[c] if step is None else round(features[c] / step)
+            for c, step in zip(self.columns, self._steps)
+        )
+
+    def get(self, key: tuple) -> Optional[float]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: float, generation: Optional[int] = None) -> None:
+        """generation을 주면 그 사이 clear()가 있었을 때 저장하지 않음"""
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """모델 교체 시 호출. 통계는 유지하고 항목만 비움."""
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
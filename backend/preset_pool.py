@@ -0,0 +1,97 @@
+"""
+난이도별 프리셋 풀 (/preset 시드 없는 요청용)
+
+난이도마다 미리 만든 프리셋(모델 예측값 포함)을 deque에 쌓아 두고 요청 시 하나씩 꺼낸다.
+백그라운드 스레드가 low_water 아래로 내려간 풀을 size까지 배치 생성으로 채운다.
+모델/범위/난이도 밴드가 바뀌면 clear()로 비우고, 그 전에 시작된 채우기 결과는 버린다(generation).
+"""
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class PresetPool:
+    def __init__(self, generate: Callable[[str, int], List[dict]], difficulties: Sequence[str],
+                 size: int, low_water: Optional[int] = None, batch: Optional[int] = None):
+        self.generate = generate
+        self.size = max(1, int(size))
+        self.low_water = self.size // 2 if low_water is None else max(0, min(int(low_water), self.size - 1))
+        self.batch = max(1, int(batch or self.size))
+        self._pools: Dict[str, deque] = {d: deque() for d in difficulties}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.errors = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="preset-pool")
+            self._thread.start()
+        self._wake.set()
+
+    def take(self, difficulty: str) -> Optional[dict]:
+        """풀에서 1개 꺼냄. 비어 있으면 None (호출 측에서 직접 생성). 부족하면 채우기 스레드를 깨운다."""
+        with self._lock:
+            pool = self._pools[difficulty]
+            item = pool.popleft() if pool else None
+            if item is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            low = len(pool) <= self.low_water
+        if low:
+            self._wake.set()
+        return item
+
+    def clear(self) -> None:
+        with self._lock:
+            for pool in self._pools.values():
+                pool.clear()
+            self.generation += 1
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(timeout=5.0)
+            self._wake.clear()
+            for difficulty in list(self._pools):
+                self._fill(difficulty)
+
+    def _fill(self, difficulty: str) -> None:
+        while True:
+            with self._lock:
+                missing = self.size - len(self._pools[difficulty])
+                generation = self.generation
+            if missing <= 0:
+                return
+            try:
+                items = self.generate(difficulty, min(missing, self.batch))
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"[WARN] Preset pool refill failed for '{difficulty}': {e}")
+                return
+            with self._lock:
+                if generation != self.generation:
+                    continue  # 채우는 동안 clear() → 버리고 다시
+                self._pools[difficulty].extend(items[:self.size - len(self._pools[difficulty])])
+                self.generated += len(items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": True,
+                "size": self.size,
+                "low_water": self.low_water,
+                "available": {d: len(p) for d, p in self._pools.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "generated": self.generated,
+                "errors": self.errors,
+            }
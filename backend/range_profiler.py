@@ -0,0 +1,246 @@
+"""
+원본 미션 데이터셋 범위 프로파일러 (CSV_numeric_min_max_summary.csv 대체)
+
+space_missions_dataset.csv를 청크 단위로 한 번만 읽으면서(메모리 일정)
+  - 숫자 컬럼: 개수/결측/정확한 min·max·평균 + 근사 분위수 (컬럼별 고정 크기 저수지 표본)
+  - 범주 컬럼: 값별 빈도 (서로 다른 값이 max_categories를 넘으면 나머지는 other로 합산)
+을 계산해 작은 JSON 요약(dataset_profile.json)으로 쓴다. level.py는 이 파일이 있으면 CSV 요약 대신 읽는다.
+원본 파일의 크기/mtime을 함께 기록해 두고, 바뀌지 않았으면 다시 계산하지 않는다 (--force로 강제).
+
+    python range_profiler.py space_missions_dataset.csv --output dataset_profile.json \\
+        --csv-summary CSV_numeric_min_max_summary.csv
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PROFILE_FORMAT = 1
+# 요약에 기록할 분위수 격자 (0 = min, 1 = max는 정확한 값)
+QUANTILE_GRID = np.round(np.linspace(0.0, 1.0, 101), 2)
+
+
+class NumericProfile:
+    """숫자 컬럼 1개: 정확한 min/max/평균 + 저수지 표본(크기 sample_size)으로 근사 분위수"""
+
+    def __init__(self, sample_size: int, rng: np.random.Generator):
+        self.sample = np.empty(max(1, int(sample_size)), dtype=float)
+        self.rng = rng
+        self.count = 0
+        self.missing = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values: pd.Series) -> None:
+        x = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+        finite = np.isfinite(x)
+        self.missing += int((~finite).sum())
+        x = x[finite]
+        if not x.size:
+            return
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self.total += float(x.sum())
+
+        # 저수지 표본 (Algorithm R을 청크 단위로 벡터화): 먼저 빈 칸을 채우고,
+        # 전체 i번째 값은 확률 k/(i+1)로 임의의 칸을 교체
+        k, seen = len(self.sample), self.count
+        fill = min(max(k - seen, 0), x.size)
+        self.sample[seen:seen + fill] = x[:fill]
+        rest = x[fill:]
+        if rest.size:
+            positions = np.arange(seen + fill, seen + x.size)
+            slots = (self.rng.random(rest.size) * (positions + 1)).astype(np.int64)
+            keep = slots < k
+            self.sample[slots[keep]] = rest[keep]
+        self.count += int(x.size)
+
+    def summary(self, grid: np.ndarray = QUANTILE_GRID) -> dict:
+        if not self.count:
+            return {"count": 0, "missing": self.missing}
+        sample = self.sample[:min(self.count, len(self.sample))]
+        q = np.quantile(sample, grid)
+        q[0], q[-1] = self.min, self.max
+        q = np.maximum.accumulate(np.clip(q, self.min, self.max))
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count,
+            "quantiles": [round(float(v), 6) for v in q],
+        }
+
+
+class CategoryProfile:
+    """범주 컬럼 1개: 값별 빈도 (서로 다른 값 max_categories개까지, 이후 처음 보는 값은 other)"""
+
+    def __init__(self, max_categories: int):
+        self.max_categories = max(1, int(max_categories))
+        self.counts: Dict[str, int] = {}
+        self.other = 0
+        self.missing = 0
+
+    def add(self, values: pd.Series) -> None:
+        self.missing += int(values.isna().sum())
+        for value, n in values.dropna().astype(str).value_counts(sort=False).items():
+            if value in self.counts:
+                self.counts[value] += int(n)
+            elif len(self.counts) < self.max_categories:
+                self.counts[value] = int(n)
+            else:
+                self.other += int(n)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return {
+            "count": sum(self.counts.values()) + self.other,
+            "missing": self.missing,
+            "frequencies": dict(ordered),
+            "other": self.other,
+        }
+
+
+def source_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"file": os.path.basename(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], sample_size: int = 20_000, max_categories: int = 100,
+                   seed: int = 0, categorical: Optional[Sequence[str]] = None) -> dict:
+    """
+    DataFrame 청크들 → 프로파일 dict. 컬럼 종류는 첫 청크 기준
+    (categorical에 없는 컬럼 중 숫자 dtype이면 숫자, 아니면 범주).
+    """
+    rng = np.random.default_rng(seed)
+    numeric: Dict[str, NumericProfile] = {}
+    categories: Dict[str, CategoryProfile] = {}
+    rows = 0
+    for chunk in chunks:
+        if not numeric and not categories:
+            for col in chunk.columns:
+                if col not in (categorical or ()) and pd.api.types.is_numeric_dtype(chunk[col]):
+                    numeric[col] = NumericProfile(sample_size, rng)
+                else:
+                    categories[col] = CategoryProfile(max_categories)
+        for col, prof in numeric.items():
+            if col in chunk.columns:
+                prof.add(chunk[col])
+        for col, prof in categories.items():
+            if col in chunk.columns:
+                prof.add(chunk[col])
+        rows += len(chunk)
+    return {
+        "format": PROFILE_FORMAT,
+        "rows": rows,
+        "quantile_grid": [float(p) for p in QUANTILE_GRID],
+        "numeric": {col: prof.summary() for col, prof in numeric.items()},
+        "categorical": {col: prof.summary() for col, prof in categories.items()},
+    }
+
+
+def profile_dataset(path: str, chunk_size: int = 100_000, **kwargs) -> dict:
+    """CSV 파일을 청크 단위로 한 번 읽어 프로파일 생성 (원본 크기/mtime 포함)"""
+    stamp = source_stamp(path)
+    profile = profile_chunks(pd.read_csv(path, chunksize=chunk_size), **kwargs)
+    profile["source"] = stamp
+    return profile
+
+
+# =========================
+# 요약 파일 입출력
+# =========================
+def write_profile(profile: dict, path: str) -> None:
+    """임시 파일에 쓰고 rename으로 교체 (서버의 파일 감시가 반쯤 쓴 파일을 읽지 않도록)"""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def read_profile(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    if profile.get("format") != PROFILE_FORMAT:
+        raise ValueError(f"Unsupported dataset profile format {profile.get('format')!r} in {path}")
+    return profile
+
+
+def is_fresh(profile_path: str, source_path: str) -> bool:
+    """요약이 현재 원본 파일(크기/mtime)로 만든 것이면 True"""
+    try:
+        profile = read_profile(profile_path)
+    except (OSError, ValueError):
+        return False
+    stamp = source_stamp(source_path)
+    return all(profile.get("source", {}).get(k) == stamp[k] for k in ("size", "mtime_ns"))
+
+
+def quantile_table(profile: dict, column: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """숫자 컬럼의 (분위수 확률, 값) 배열. 없으면 None."""
+    quantiles = profile.get("numeric", {}).get(column, {}).get("quantiles")
+    if not quantiles:
+        return None
+    return np.asarray(profile["quantile_grid"], dtype=float), np.asarray(quantiles, dtype=float)
+
+
+def profile_ranges(profile: dict, quantiles: Optional[Tuple[float, float]] = None) -> Dict[str, Tuple[float, float]]:
+    """
+    숫자 컬럼별 (하한, 상한). quantiles=(0.01, 0.99)처럼 주면 min/max 대신 해당 분위수
+    (격자 사이 값은 선형 보간)로 범위를 좁혀 이상치를 잘라낸다.
+    """
+    ranges = {}
+    for col, stats in profile.get("numeric", {}).items():
+        if not stats.get("count"):
+            continue
+        if quantiles is None:
+            ranges[col] = (float(stats["min"]), float(stats["max"]))
+        else:
+            probs, values = quantile_table(profile, col)
+            lo, hi = np.interp(quantiles, probs, values)
+            ranges[col] = (float(lo), float(hi))
+    return ranges
+
+
+def write_range_csv(profile: dict, path: str) -> None:
+    """기존 형식(file,feature,min,max)의 요약 CSV도 함께 생성"""
+    file_name = profile.get("source", {}).get("file", "")
+    rows: List[dict] = [
+        {"file": file_name, "feature": col, "min": lo, "max": hi}
+        for col, (lo, hi) in profile_ranges(profile).items()
+    ]
+    pd.DataFrame(rows, columns=["file", "feature", "min", "max"]).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="미션 데이터셋 범위/분위수/범주 빈도 프로파일 (스트리밍 1회 통과)")
+    parser.add_argument("input", help="원본 데이터셋 CSV (space_missions_dataset.csv)")
+    parser.add_argument("--output", default=os.getenv("DATASET_PROFILE_PATH", "dataset_profile.json"))
+    parser.add_argument("--csv-summary", default="", help="기존 형식 min/max 요약 CSV도 쓸 경로 (선택)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="청크당 행 수")
+    parser.add_argument("--sample-size", type=int, default=20_000, help="숫자 컬럼별 분위수 표본 크기")
+    parser.add_argument("--max-categories", type=int, default=100, help="범주 컬럼별 빈도를 기록할 최대 값 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="원본이 바뀌지 않았어도 다시 계산")
+    args = parser.parse_args()
+
+    if not args.force and is_fresh(args.output, args.input):
+        print(f"[INFO] {args.output} is up to date with {args.input}; skipping (use --force to rebuild)")
+        return
+    t0 = time.perf_counter()
+    profile = profile_dataset(args.input, chunk_size=max(1, args.chunk_size), sample_size=args.sample_size,
+                              max_categories=args.max_categories, seed=args.seed)
+    write_profile(profile, args.output)
+    if args.csv_summary:
+        write_range_csv(profile, args.csv_summary)
+    print(f"[INFO] Profiled {profile['rows']} rows ({len(profile['numeric'])} numeric, "
+          f"{len(profile['categorical'])} categorical columns) in {time.perf_counter() - t0:.2f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
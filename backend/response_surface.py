@@ -0,0 +1,164 @@
+"""
+응답 곡면 인덱스 (/predict?mode=approx)
+
+범주 조합(미션 유형 × 대상 × 발사체)마다 수치 feature 격자 위에서 모델 값을 미리 계산해
+float32 배열 하나로 보관하고, 요청 시에는 다중 선형 보간(2^D 꼭짓점)으로 근사값을 낸다.
+슬라이더 드래그처럼 정확한 포레스트 출력이 필요 없는 트래픽을 마이크로초 단위로 처리한다.
+
+배열은 <경로>.npy + <경로>.json(축/범주/모델 버전)으로 저장되고 np.load(mmap_mode="r")로 읽는다.
+"""
+import itertools
+import json
+import os
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 격자 평가 시 한 번에 모델에 넣는 행 수
+BUILD_CHUNK = 65536
+
+
+class ResponseSurface:
+    def __init__(
+        self,
+        categorical_columns: Sequence[str],
+        categories: Sequence[Sequence[str]],
+        numeric_columns: Sequence[str],
+        axes: Sequence[np.ndarray],
+        values: np.ndarray,
+        model_version: str,
+    ):
+        self.categorical_columns = list(categorical_columns)
+        self.categories = [list(c) for c in categories]
+        self.numeric_columns = list(numeric_columns)
+        self.axes = [np.asarray(a, dtype=float) for a in axes]
+        self.values = values  # shape = (범주 조합 수, *격자)
+        self.model_version = model_version
+
+        self._cat_index = [{c: i for i, c in enumerate(cats)} for cats in self.categories]
+        self._cat_strides = np.array(
+            [int(np.prod([len(c) for c in self.categories[k + 1:]])) for k in range(len(self.categories))],
+            dtype=np.int64,
+        )
+        self._lo = np.array([a[0] for a in self.axes])
+        self._step = np.array([(a[-1] - a[0]) / (len(a) - 1) if len(a) > 1 else 1.0 for a in self.axes])
+        self._size = np.array([len(a) for a in self.axes], dtype=np.int64)
+        self._strides = np.array(
+            [int(np.prod(self._size[d + 1:])) for d in range(len(self.axes))], dtype=np.int64,
+        )
+        self._flat = self.values.reshape(self.values.shape[0], -1)
+        # 2^D 꼭짓점 (D개 축 각각 0/1)과 그 평탄 인덱스 오프셋
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self.axes))), dtype=bool)
+        self._corner_offsets = self._corners.astype(np.int64) @ self._strides
+
+    @property
+    def grid(self) -> List[int]:
+        return self._size.tolist()
+
+    def combo_index(self, cats: Sequence[object]) -> Optional[int]:
+        """범주 값 목록 → 조합 번호. 격자에 없는 범주면 None."""
+        idx = 0
+        for k, value in enumerate(cats):
+            i = self._cat_index[k].get(value)
+            if i is None:
+                return None
+            idx += i * int(self._cat_strides[k])
+        return idx
+
+    def interpolate(self, combo: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """
+        combo: (n,) 범주 조합 번호, points: (n, D) 수치 feature.
+        격자 밖 값은 경계로 붙인다. (모든 축의 격자 점은 2개 이상)
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        pos = (points - self._lo) / self._step
+        base = np.clip(np.floor(pos).astype(np.int64), 0, self._size - 2)
+        t = np.clip(pos - base, 0.0, 1.0)
+
+        # (n, 2^D) 꼭짓점 인덱스와 가중치를 한 번에 계산
+        idx = (base @ self._strides)[:, None] + self._corner_offsets[None, :]
+        w = np.where(self._corners[None, :, :], t[:, None, :], 1.0 - t[:, None, :]).prod(axis=2)
+        return (w * self._flat[np.asarray(combo)[:, None], idx]).sum(axis=1)
+
+    def predict_one(self, features: dict) -> Optional[float]:
+        """features dict 1건 근사값. 범주가 격자에 없으면 None(=정확 경로 사용)."""
+        combo = self.combo_index([features[c] for c in self.categorical_columns])
+        if combo is None:
+            return None
+        point = np.array([[features[c] for c in self.numeric_columns]], dtype=float)
+        return float(self.interpolate(np.array([combo]), point)[0])
+
+    def info(self) -> dict:
+        return {
+            "model_version": self.model_version,
+            "grid": self.grid,
+            "combos": int(self.values.shape[0]),
+            "bytes": int(self.values.nbytes),
+        }
+
+    def save(self, path: str) -> None:
+        """<path>.npy(값) + <path>.json(메타) 저장 (임시 파일에 쓰고 교체)"""
+        tmp = f"{path}.tmp{os.getpid()}"
+        np.save(f"{tmp}.npy", np.ascontiguousarray(self.values, dtype=np.float32))
+        with open(f"{tmp}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "categorical_columns": self.categorical_columns,
+                "categories": self.categories,
+                "numeric_columns": self.numeric_columns,
+                "axes": [a.tolist() for a in self.axes],
+                "model_version": self.model_version,
+            }, f)
+        os.replace(f"{tmp}.npy", f"{path}.npy")
+        os.replace(f"{tmp}.json", f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "ResponseSurface":
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        values = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)
+        return cls(
+            meta["categorical_columns"], meta["categories"], meta["numeric_columns"],
+            [np.asarray(a) for a in meta["axes"]], values, meta["model_version"],
+        )
+
+
+def build_response_surface(
+    predict_frame: Callable[[pd.DataFrame], np.ndarray],
+    columns: Sequence[str],
+    categories: Dict[str, Sequence[str]],
+    axes: Dict[str, np.ndarray],
+    model_version: str,
+) -> ResponseSurface:
+    """
+    모든 범주 조합 × 수치 격자를 BUILD_CHUNK 행씩 배치 평가해 ResponseSurface 생성.
+    columns: 모델 입력 컬럼 순서, categories/axes: 범주 컬럼별 값 목록 / 수치 컬럼별 격자.
+    """
+    cat_cols = [c for c in columns if c in categories]
+    num_cols = [c for c in columns if c in axes]
+    combos = list(itertools.product(*[categories[c] for c in cat_cols]))
+    mesh = np.meshgrid(*[axes[c] for c in num_cols], indexing="ij")
+    grid_points = np.stack([m.ravel() for m in mesh], axis=1)
+    n_grid = grid_points.shape[0]
+
+    combo_table = np.empty((len(combos), len(cat_cols)), dtype=object)
+    for i, combo in enumerate(combos):
+        combo_table[i] = combo
+
+    total = len(combos) * n_grid
+    values = np.empty(total, dtype=np.float32)
+    for start in range(0, total, BUILD_CHUNK):
+        rows = np.arange(start, min(start + BUILD_CHUNK, total))
+        combo_idx, grid_idx = np.divmod(rows, n_grid)
+        frame = {}
+        for k, c in enumerate(cat_cols):
+            frame[c] = combo_table[combo_idx, k]
+        for k, c in enumerate(num_cols):
+            frame[c] = grid_points[grid_idx, k]
+        values[start:start + len(rows)] = predict_frame(pd.DataFrame(frame, columns=list(columns)))
+
+    shape = (len(combos),) + tuple(len(axes[c]) for c in num_cols)
+    return ResponseSurface(
+        cat_cols, [list(categories[c]) for c in cat_cols], num_cols,
+        [axes[c] for c in num_cols], values.reshape(shape), model_version,
+    )
@@ -0,0 +1,277 @@
+"""
+채점 핵심 (서버 level.py와 오프라인 배치 채점 CLI batch_score.py가 함께 쓰는 부분)
+
+입력 스키마(MissionInput), feature 범위 파일 읽기, 클램프 → 무게 효과 → 모델 1회 호출 →
+페널티/클립/임계값 판정까지의 열 단위 계산만 담는다.
+import해도 모델 로드, 파일 감시, 백그라운드 스레드 같은 부수 효과가 없으므로
+프로세스 풀 워커가 서버 모듈 전체를 띄우지 않고 같은 계산을 할 수 있다.
+범위는 전역 상태 대신 인자(ranges)로 받는다 (서버는 핫 리로드되는 FEATURE_RANGES를 넘긴다).
+"""
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from range_profiler import profile_ranges, read_profile
+
+Ranges = Dict[str, Tuple[float, float]]
+
+# 모델 입력 컬럼 (predict()의 features dict 순서와 동일)
+MODEL_FEATURE_COLUMNS = [
+    "Mission Type",
+    "Target Type",
+    "Launch Vehicle",
+    "Distance from Earth (light-years)",
+    "Mission Duration (years)",
+    "Scientific Yield (points)",
+    "Crew Size",
+    "Fuel Consumption (tons)",
+]
+
+# ===== (1) 성공 임계값: 0~1 스케일, 기본 0.5 =====
+SUCCESS_THRESHOLD_PERCENT = float(os.getenv("SUCCESS_THRESHOLD_PERCENT", "50.0"))
+
+# =========================
+# CSV/프로파일 기반 feature 범위
+# =========================
+CSV_RANGE_PATH = os.getenv("CSV_RANGE_PATH", "CSV_numeric_min_max_summary.csv")
+# range_profiler.py가 만든 데이터셋 프로파일. 파일이 있으면 CSV 요약 대신 사용
+DATASET_PROFILE_PATH = os.getenv("DATASET_PROFILE_PATH", "dataset_profile.json")
+
+def parse_range_quantiles(spec: str) -> Optional[Tuple[float, float]]:
+    """"lo,hi" → (lo, hi). 비어 있으면 None, 형식이 틀리면 ValueError (기동 시 바로 실패)"""
+    if not spec.strip():
+        return None
+    try:
+        lo, hi = (float(q) for q in spec.split(","))
+    except ValueError:
+        raise ValueError(f"RANGE_QUANTILES must be two comma-separated numbers like '0.01,0.99', got {spec!r}")
+    if not 0.0 <= lo < hi <= 1.0:
+        raise ValueError(f"RANGE_QUANTILES must satisfy 0 <= lo < hi <= 1, got {spec!r}")
+    return lo, hi
+
+# 프로파일 분위수로 범위 지정 (예: "0.01,0.99" → 이상치를 잘라낸 범위로 클램프/밴드). 비우면 min/max
+RANGE_QUANTILES = parse_range_quantiles(os.getenv("RANGE_QUANTILES", ""))
+
+# === API 필드 ↔ CSV feature 이름 매핑 ===
+API2CSV = {
+    "payload_tons": "Payload Weight (tons)",
+    "distance_ly": "Distance from Earth (light-years)",
+    "duration_years": "Mission Duration (years)",
+    "science_pts": "Scientific Yield (points)",
+    "crew_size": "Crew Size",
+    "fuel_tons": "Fuel Consumption (tons)",
+}
+# CSV에 있지만 모델 입력에 쓰지 않는 컬럼(무시)
+IGNORED_CSV_FEATURES = {
+    "Mission Cost (billion USD)",
+    "Mission Success (%)",
+}
+
+# === CSV에 없을 때 사용할 기본 범위(폴백) ===
+DEFAULT_RANGES: Ranges = {
+    "Payload Weight (tons)": (5.0, 80.0),
+    "Distance from Earth (light-years)": (5.0, 200.0),
+    "Mission Duration (years)": (3.0, 20.0),
+    "Scientific Yield (points)": (20.0, 100.0),
+    "Crew Size": (4.0, 20.0),
+    "Fuel Consumption (tons)": (1000.0, 8000.0),
+}
+
+def range_source_path() -> str:
+    """범위를 읽을 파일: 데이터셋 프로파일이 있으면 그것, 없으면 CSV 요약"""
+    if DATASET_PROFILE_PATH and os.path.isfile(DATASET_PROFILE_PATH):
+        return DATASET_PROFILE_PATH
+    return CSV_RANGE_PATH
+
+def read_range_source(path: Optional[str] = None) -> Tuple[Ranges, Optional[dict]]:
+    """범위 파일 → (feature별 (min, max), 프로파일(.json일 때만)) (실패 시 예외)"""
+    path = path or range_source_path()
+    if path.lower().endswith(".json"):
+        profile = read_profile(path)
+        ranges = profile_ranges(profile, RANGE_QUANTILES)
+    else:
+        profile = None
+        if RANGE_QUANTILES is not None:
+            print(f"[WARN] RANGE_QUANTILES is ignored: '{path}' is not a dataset profile (min/max ranges used)")
+        df = pd.read_csv(path)
+        ranges = {str(f): (float(fmin), float(fmax)) for f, fmin, fmax in zip(df["feature"], df["min"], df["max"])}
+    out = {}
+    for f, (fmin, fmax) in ranges.items():
+        if f in IGNORED_CSV_FEATURES:
+            continue
+        out[f] = (fmax, fmin) if fmin > fmax else (fmin, fmax)  # 방어
+    return out, profile
+
+def get_range_by_csv_name(csv_name: str, ranges: Ranges) -> Tuple[float, float]:
+    """CSV feature명으로 ranges에서 범위를 가져오되, 없으면 DEFAULT_RANGES로 폴백."""
+    if csv_name in ranges:
+        lo, hi = ranges[csv_name]
+        return (hi, lo) if lo > hi else (lo, hi)
+    if csv_name in DEFAULT_RANGES:
+        return DEFAULT_RANGES[csv_name]
+    raise KeyError(f"Missing range for CSV feature '{csv_name}'")
+
+def get_range_by_api_name(api_name: str, ranges: Ranges) -> Tuple[float, float]:
+    """API 필드명으로 CSV 이름을 찾아서 범위를 반환."""
+    if api_name not in API2CSV:
+        raise KeyError(f"Unknown API feature '{api_name}' (no mapping to CSV)")
+    return get_range_by_csv_name(API2CSV[api_name], ranges)
+
+def clamp_array_by_api_name(api_name: str, values: np.ndarray, ranges: Ranges) -> np.ndarray:
+    """API 필드 값 배열을 범위로 클램프. 범위가 없으면 원값(float) 그대로."""
+    values = np.asarray(values, dtype=float)
+    try:
+        lo, hi = get_range_by_api_name(api_name, ranges)
+    except KeyError:
+        return values
+    return np.clip(values, lo, hi)
+
+# =========================
+# 입력 스키마
+# =========================
+class MissionInput(BaseModel):
+    payload_tons: float = Field(ge=0, description="실을 무게(톤). 모델 입력에는 직접 쓰지 않음, 페널티 계산용.")
+    mission_type: str = Field(default="Exploration")
+    target_type: str = Field(default="Planet")
+    launch_vehicle: str = Field(default="Starship")
+    distance_ly: float = Field(default=45.0, ge=0)
+    duration_years: float = Field(default=12.0, ge=0)
+    science_pts: float = Field(default=60.0, ge=0)
+    crew_size: int = Field(default=10, ge=1)
+    fuel_tons: float = Field(default=3000.0, ge=0)
+    clamp_min: float = Field(default=0.0)
+    clamp_max: float = Field(default=100.0)
+
+# =========================
+# 무게 간접 영향 / 페널티
+# =========================
+def apply_payload_effects(payload_tons, duration_years, science_pts, fuel_tons):
+    """payload가 클수록 기간↑, 연료소모↑, 과학효율↓ (스칼라/NumPy 배열 모두 지원)"""
+    duration_adj = duration_years + 0.10 * payload_tons
+    fuel_adj = fuel_tons + 2.0 * payload_tons
+    science_adj = np.maximum(0.0, science_pts - 0.30 * payload_tons)
+    return duration_adj, science_adj, fuel_adj
+
+# 고정 페널티: 무게 1톤당 0.4% 감소
+PAYLOAD_PENALTY_PER_TON = 0.4
+
+def payload_penalty(payload_tons):
+    """무게 페널티 (스칼라/NumPy 배열 모두 지원)"""
+    return PAYLOAD_PENALTY_PER_TON * payload_tons
+
+# =========================
+# 열 단위 채점 (클램프/무게 효과/페널티를 배열 연산으로, 모델 호출 1회)
+# =========================
+NUMERIC_INPUT_FIELDS = ["payload_tons", "distance_ly", "duration_years", "science_pts", "crew_size", "fuel_tons",
+                        "clamp_min", "clamp_max"]
+CATEGORICAL_INPUT_FIELDS = ["mission_type", "target_type", "launch_vehicle"]
+
+def missions_to_columns(missions: Sequence[MissionInput]) -> Dict[str, np.ndarray]:
+    """MissionInput 목록 → 필드별 배열 (숫자: float, 범주: object)"""
+    n = len(missions)
+    cols = {
+        name: np.fromiter((getattr(m, name) for m in missions), dtype=float, count=n)
+        for name in NUMERIC_INPUT_FIELDS
+    }
+    for name in CATEGORICAL_INPUT_FIELDS:
+        cols[name] = np.array([getattr(m, name) for m in missions], dtype=object)
+    return cols
+
+def input_source_column(name: str, columns) -> Optional[str]:
+    """MissionInput 필드가 담긴 DataFrame 컬럼명 (필드명 우선, 숫자 필드는 API2CSV의 CSV 컬럼명도 허용). 없으면 None"""
+    if name in columns:
+        return name
+    source = API2CSV.get(name)
+    return source if source in columns else None
+
+def columns_from_frame(df: pd.DataFrame) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    MissionInput 필드명(숫자 필드는 API2CSV의 CSV 컬럼명도 허용) 컬럼을 가진 DataFrame
+    → (필드별 배열, 유효 행 마스크). 행마다 MissionInput을 만들지 않고 같은 규칙을 열 단위로 적용:
+    없는 컬럼/빈 값은 기본값, 필수 필드 누락·숫자 변환 실패·ge 제약 위반·정수 필드의 소수는 무효.
+    """
+    n = len(df)
+    valid = np.ones(n, dtype=bool)
+    cols: Dict[str, np.ndarray] = {}
+    for name, field in MissionInput.model_fields.items():
+        source = input_source_column(name, df.columns)
+        raw = df[source] if source is not None else None
+        missing = raw.isna().to_numpy() if raw is not None else np.ones(n, dtype=bool)
+        if field.is_required():
+            valid &= ~missing
+
+        if name in CATEGORICAL_INPUT_FIELDS:
+            values = raw.astype(str).to_numpy(dtype=object, copy=True) if raw is not None else np.empty(n, dtype=object)
+            values[missing] = field.default
+            cols[name] = values
+            continue
+
+        values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=float, copy=True) if raw is not None else np.full(n, np.nan)
+        valid &= missing | ~np.isnan(values)
+        if not field.is_required():
+            values[missing] = float(field.default)
+        for constraint in field.metadata:
+            ge = getattr(constraint, "ge", None)
+            if ge is not None:
+                valid &= ~(values < ge)
+        if field.annotation is int:
+            valid &= ~(values != np.round(values))
+        cols[name] = values
+    return cols, valid
+
+def select_rows(cols: Dict[str, np.ndarray], mask: np.ndarray) -> Dict[str, np.ndarray]:
+    return {name: values[mask] for name, values in cols.items()}
+
+def build_feature_frame_from_columns(cols: Dict[str, np.ndarray], ranges: Ranges) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    필드별 배열 → (모델 입력 DataFrame, 클램프된 payload 배열).
+    predict()의 (A)~(C) 단계를 행 단위 루프 없이 열 단위 배열 연산으로 수행.
+    """
+    payload        = clamp_array_by_api_name("payload_tons", cols["payload_tons"], ranges)
+    distance_ly    = clamp_array_by_api_name("distance_ly", cols["distance_ly"], ranges)
+    duration_years = clamp_array_by_api_name("duration_years", cols["duration_years"], ranges)
+    science_pts    = clamp_array_by_api_name("science_pts", cols["science_pts"], ranges)
+    crew_size      = np.round(clamp_array_by_api_name("crew_size", cols["crew_size"], ranges)).astype(np.int64)
+    fuel_tons      = clamp_array_by_api_name("fuel_tons", cols["fuel_tons"], ranges)
+
+    dur, sci, fuel = apply_payload_effects(payload, duration_years, science_pts, fuel_tons)
+
+    X = pd.DataFrame({
+        "Mission Type": cols["mission_type"],
+        "Target Type": cols["target_type"],
+        "Launch Vehicle": cols["launch_vehicle"],
+        "Distance from Earth (light-years)": distance_ly,
+        "Mission Duration (years)": dur,
+        "Scientific Yield (points)": sci,
+        "Crew Size": crew_size,
+        "Fuel Consumption (tons)": fuel,
+    }, columns=MODEL_FEATURE_COLUMNS)
+    return X, payload
+
+def score_columns(cols: Dict[str, np.ndarray], model, ranges: Ranges, explain: bool = False) -> Dict[str, object]:
+    """
+    필드별 배열 → 클램프/무게 효과 → 모델(LoadedModel) 1회 호출 → 페널티/클립/임계값 판정.
+    결과는 배열 dict (X, success_raw, applied_penalty, success_final, is_success).
+    explain=True면 트리 경로 순회 1회로 예측값과 함께 contributions/bias도 계산 (지원하지 않으면 ValueError).
+    """
+    X, payload = build_feature_frame_from_columns(cols, ranges)
+    scored: Dict[str, object] = {"X": X}
+    if explain:
+        explained = model.explain_frame(X)
+        if explained is None:
+            raise ValueError("Current model does not support tree path explanations")
+        success_raw, scored["contributions"], scored["bias"] = explained
+    else:
+        success_raw = np.asarray(model.predict_frame(X), dtype=float)
+    penalty = payload_penalty(payload)
+    success_final = np.clip(success_raw - penalty, cols["clamp_min"], cols["clamp_max"])
+    scored.update({
+        "success_raw": success_raw,
+        "applied_penalty": penalty,
+        "success_final": success_final,
+        "is_success": success_final >= SUCCESS_THRESHOLD_PERCENT,
+    })
+    return scored
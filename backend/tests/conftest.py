@@ -0,0 +1,34 @@
+"""
+테스트 공통 설정
+
+backend/를 import 경로에 넣고, bench_model의 작은 대체 모델을 임시 디렉터리에 만들어
+level.py가 import될 때 그 모델과 저장소의 범위 CSV를 읽도록 환경 변수를 정한다
+(level.py는 import 시 설정을 읽으므로 이 파일이 먼저 실행되어야 한다).
+"""
+import os
+import sys
+import tempfile
+
+import joblib
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_model import build_stand_in_model  # noqa: E402
+
+TEST_DIR = tempfile.mkdtemp(prefix="space-mission-tests-")
+CSV_RANGE_PATH = os.path.join(BACKEND_DIR, "CSV_numeric_min_max_summary.csv")
+MODEL_PATH = os.path.join(TEST_DIR, "model.pkl")
+joblib.dump(build_stand_in_model(n_rows=400, n_estimators=20, seed=0, csv_path=CSV_RANGE_PATH), MODEL_PATH)
+
+os.environ.update({
+    "MODEL_PATH": MODEL_PATH,
+    "CSV_RANGE_PATH": CSV_RANGE_PATH,
+    "DATASET_PROFILE_PATH": os.path.join(TEST_DIR, "no_profile.json"),
+})
+
+
+@pytest.fixture(scope="session")
+def model_path() -> str:
+    return MODEL_PATH
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_queue_full_is_shed_immediately():
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=0)
+        await ctl.acquire()
+        with pytest.raises(Overloaded) as exc:
+            await ctl.acquire()
+        return ctl, exc.value
+
+    ctl, e = run(scenario())
+    assert e.reason == "queue_full"
+    assert e.retry_after >= 1
+    assert ctl.shed["queue_full"] == 1
+    assert ctl.in_flight == 1
+
+
+def test_budget_sheds_when_expected_wait_exceeds_it():
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=10, budget_ms=100)
+        await ctl.acquire()
+        ctl.release(service_seconds=0.5)  # 처리 시간 0.5초 → 대기 1건이면 예상 0.5초 > 100ms
+        await ctl.acquire()
+        with pytest.raises(Overloaded) as exc:
+            await ctl.acquire()
+        return ctl, exc.value
+
+    ctl, e = run(scenario())
+    assert e.reason == "budget"
+    assert e.retry_after == 1
+    assert ctl.shed["budget"] == 1
+    assert ctl.queued == 0
+
+
+def test_waiter_times_out_after_budget():
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=10, budget_ms=20)
+        await ctl.acquire()
+        with pytest.raises(Overloaded) as exc:
+            await ctl.acquire()
+        return ctl, exc.value
+
+    ctl, e = run(scenario())
+    assert e.reason == "timeout"
+    assert ctl.shed["timeout"] == 1
+    assert ctl.queued == 0 and ctl.in_flight == 1
+
+
+def test_release_hands_slot_to_waiter_in_order():
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=10, budget_ms=1000)
+        order = []
+        await ctl.acquire()
+
+        async def waiter(i):
+            await ctl.acquire()
+            order.append(i)
+            ctl.release()
+
+        tasks = [asyncio.create_task(waiter(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        assert ctl.queued == 3
+        ctl.release()
+        await asyncio.gather(*tasks)
+        return ctl, order
+
+    ctl, order = run(scenario())
+    assert order == [0, 1, 2]
+    assert ctl.in_flight == 0
+    assert ctl.admitted == 4
+
+
+def test_unshed_acquire_waits_past_queue_and_budget():
+    # /predict/stream 청크처럼 shed=False면 큐가 가득 차도, 예산을 넘겨도 거절하지 않고 기다린다
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=0, budget_ms=10)
+        await ctl.acquire()
+        task = asyncio.create_task(ctl.acquire(shed=False))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        ctl.release()
+        await task
+        return ctl
+
+    ctl = run(scenario())
+    assert ctl.in_flight == 1
+    assert ctl.shed == {"queue_full": 0, "budget": 0, "timeout": 0}
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        ctl = AdmissionController(max_concurrent=1, max_queue=10, budget_ms=1000)
+        await ctl.acquire()
+        task = asyncio.create_task(ctl.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        ctl.release()
+        return ctl
+
+    ctl = run(scenario())
+    assert ctl.queued == 0
+    assert ctl.in_flight == 0
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import level
+
+MISSIONS = [
+    {"payload_tons": 5, "mission_type": "Mining", "crew_size": 3, "fuel_tons": 1200},
+    {"payload_tons": 55.5, "target_type": "Exoplanet", "distance_ly": 30, "launch_vehicle": "SLS"},
+    {"payload_tons": 0, "crew_size": 12, "fuel_tons": 4000, "clamp_max": 80},
+    {"payload_tons": 120, "distance_ly": 1e6, "science_pts": 500},  # 범위 밖 값 → 클램프
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    assert level.active_model is not None
+    return TestClient(level.app)
+
+
+def predict_each(client, missions):
+    outs = []
+    for m in missions:
+        r = client.post("/predict", json=m)
+        assert r.status_code == 200
+        outs.append(r.json())
+    return outs
+
+
+def test_batch_matches_per_row_predict(client):
+    r = client.post("/predict/batch", json=MISSIONS)
+    assert r.status_code == 200
+    assert r.json() == predict_each(client, MISSIONS)
+
+
+def test_batch_explain_matches_per_row_explain(client):
+    r = client.post("/predict/batch", params={"explain": "true"}, json=MISSIONS)
+    assert r.status_code == 200
+    per_row = [client.post("/predict", params={"explain": "true"}, json=m).json() for m in MISSIONS]
+    assert r.json() == per_row
+
+
+def test_sweep_matches_per_row_predict(client):
+    base = MISSIONS[0]
+    r = client.post("/sweep", json={"base": base, "x": "distance_ly", "resolution": 7})
+    assert r.status_code == 200
+    sweep = r.json()
+    per_row = predict_each(client, [{**base, "distance_ly": x} for x in sweep["x_values"]])
+    assert sweep["success_final"] == [p["success_final"] for p in per_row]
+    assert sweep["is_success"] == [p["is_success"] for p in per_row]
+
+
+def test_preset_seed_parity():
+    for diff in ("easy", "normal", "hard"):
+        many = level.random_presets(diff, 20, seed=7)
+        assert many[0] == level.random_preset(diff, seed=7)
+        assert level.random_presets(diff, 5, seed=7) == many[:5]
+        assert level.random_presets(diff, 20, seed=7) == many
+
+
+def test_predict_rejects_unknown_mode(client):
+    r = client.post("/predict", params={"mode": "fast"}, json=MISSIONS[0])
+    assert r.status_code == 422
+
+
+def stream_lines(client, body: str, fmt: str):
+    r = client.post("/predict/stream", params={"format": fmt}, content=body.encode("utf-8"))
+    assert r.status_code == 200
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+def test_stream_ndjson_reports_errors_in_place(client):
+    body = "\n".join([
+        json.dumps(MISSIONS[0]),
+        json.dumps({"payload_tons": -1}),  # 검증 실패
+        "{not json",
+        "",
+        json.dumps(MISSIONS[1]),
+    ])
+    lines = stream_lines(client, body, "ndjson")
+    expected = predict_each(client, [MISSIONS[0], MISSIONS[1]])
+
+    assert len(lines) == 4
+    assert lines[0] == expected[0]
+    assert lines[1]["line"] == 2 and lines[1]["error"][0]["loc"] == ["payload_tons"]
+    assert lines[2]["line"] == 3 and "error" in lines[2]
+    assert lines[3] == expected[1]
+
+
+def test_stream_csv_rejects_wrong_column_count(client):
+    body = "\n".join([
+        "payload_tons,Crew Size,mission_type",
+        "5,3,Mining",
+        "7,4",
+        "9,2,Research,extra",
+        "11,,",  # 빈 칸은 기본값
+    ])
+    lines = stream_lines(client, body, "csv")
+    expected = predict_each(client, [
+        {"payload_tons": 5, "crew_size": 3, "mission_type": "Mining"},
+        {"payload_tons": 11},
+    ])
+
+    assert len(lines) == 4
+    assert lines[0] == expected[0]
+    assert lines[1] == {"line": 3, "error": "expected 3 CSV values (header columns), got 2"}
+    assert lines[2] == {"line": 4, "error": "expected 3 CSV values (header columns), got 4"}
+    assert lines[3] == expected[1]
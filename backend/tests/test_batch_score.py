@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_score
+import scoring
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_chunk_without_valid_rows_is_skipped_not_fatal(tmp_path, model_path):
+    # 첫 청크(2행)가 전부 무효여도 실행이 멈추지 않고 나머지 청크를 채점
+    src = write_csv(tmp_path / "in.csv", [
+        {"payload_tons": -1, "crew_size": 5},
+        {"payload_tons": -1, "crew_size": 5},
+        {"payload_tons": 10, "crew_size": 5},
+        {"payload_tons": 20, "crew_size": 8},
+    ])
+    out = str(tmp_path / "out.csv")
+    summary = batch_score.run(src, out, model_path, chunk_size=2, workers=0)
+
+    assert summary == {**summary, "rows": 2, "skipped": 2, "chunks": 2}
+    scored = pd.read_csv(out)
+    assert list(scored["payload_tons"]) == [10.0, 20.0]
+    assert list(scored.columns[-4:]) == batch_score.RESULT_COLUMNS
+
+
+def test_score_chunk_empty_result_has_result_columns(model_path):
+    batch_score.load_scorer(model_path)
+    out, skipped = batch_score.score_chunk(pd.DataFrame({"payload_tons": ["-1", "x"]}, dtype=object))
+    assert skipped == 2
+    assert len(out) == 0
+    assert list(out.columns) == ["payload_tons"] + batch_score.RESULT_COLUMNS
+
+
+def test_batch_scores_match_per_row_missions(tmp_path, model_path):
+    rows = [
+        {"payload_tons": 5, "mission_type": "Mining", "crew_size": 3, "fuel_tons": 1200},
+        {"payload_tons": 55.5, "target_type": "Exoplanet", "distance_ly": 30},
+        {"payload_tons": 0, "crew_size": 12, "fuel_tons": 4000, "clamp_max": 80},
+    ]
+    out = str(tmp_path / "out.csv")
+    batch_score.run(write_csv(tmp_path / "in.csv", rows), out, model_path, chunk_size=2, workers=0)
+    scored = pd.read_csv(out)
+
+    missions = [scoring.MissionInput(**row) for row in rows]
+    expected = scoring.score_columns(scoring.missions_to_columns(missions), batch_score._model, batch_score._ranges)
+    np.testing.assert_allclose(scored["success_final"], np.round(expected["success_final"], 4))
+    np.testing.assert_array_equal(scored["is_success"], expected["is_success"])
+
+
+def test_parquet_output_schema_is_stable_across_chunks(tmp_path, model_path):
+    pytest.importorskip("pyarrow")
+    # 첫 청크는 정수/빈 컬럼, 다음 청크는 결측(→ float)과 문자열 → 청크별 추론 dtype이 달라지는 입력
+    src = write_csv(tmp_path / "in.csv", [
+        {"payload_tons": 10, "crew_size": 5, "note": None},
+        {"payload_tons": 11, "crew_size": 6, "note": None},
+        {"payload_tons": 12, "crew_size": None, "note": "late"},
+        {"payload_tons": 13.5, "crew_size": 7, "note": "text"},
+    ])
+    out = str(tmp_path / "out.parquet")
+    summary = batch_score.run(src, out, model_path, chunk_size=2, workers=0)
+
+    scored = pd.read_parquet(out)
+    assert summary["rows"] == len(scored) == 4
+    assert scored["payload_tons"].tolist() == [10.0, 11.0, 12.0, 13.5]
+    assert scored["note"].tolist()[2:] == ["late", "text"]
@@ -0,0 +1,108 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import fast_predict
+from bench_model import read_ranges, synthetic_dataset
+from compiled_forest import CompiledForest, compile_pipeline
+from model_store import load_model
+from scoring import MODEL_FEATURE_COLUMNS
+
+from conftest import CSV_RANGE_PATH
+
+
+@pytest.fixture(scope="module")
+def pipe(model_path):
+    return joblib.load(model_path)
+
+
+@pytest.fixture(scope="module")
+def frame():
+    # 학습 분포 + 범위 밖 값 + 모르는 범주(OneHotEncoder ignore) 행
+    X = synthetic_dataset(200, seed=123, ranges=read_ranges(CSV_RANGE_PATH))[MODEL_FEATURE_COLUMNS]
+    extra = X.iloc[:2].copy()
+    extra["Distance from Earth (light-years)"] = [-5.0, 1e6]
+    extra["Mission Type"] = ["Unknown", "Mining"]
+    return pd.concat([X, extra], ignore_index=True)
+
+
+def test_compiled_engine_matches_pipeline(pipe, frame):
+    compiled = compile_pipeline(pipe)
+    assert compiled is not None
+    np.testing.assert_allclose(compiled.predict(frame), pipe.predict(frame), rtol=0, atol=1e-9)
+
+    per_tree = compiled.forest.predict_per_tree(compiled.transform(frame))
+    assert per_tree.shape == (compiled.forest.n_trees, len(frame))
+    np.testing.assert_allclose(per_tree.mean(axis=0), pipe.predict(frame), rtol=0, atol=1e-9)
+
+
+def test_compiled_forest_mmap_roundtrip(pipe, frame, tmp_path):
+    compiled = compile_pipeline(pipe)
+    compiled.forest.save(str(tmp_path))
+    loaded = CompiledForest.load(str(tmp_path), mmap=True)
+    Xt = compiled.transform(frame)
+    np.testing.assert_array_equal(loaded.predict(Xt), compiled.forest.predict(Xt))
+
+
+@pytest.mark.parametrize("engine", ["sklearn", "compiled"])
+def test_fast_path_matches_pipeline(pipe, frame, model_path, engine):
+    model = load_model(model_path, MODEL_FEATURE_COLUMNS, engine=engine)
+    assert model.fast is not None
+    expected = pipe.predict(frame)
+    rows = frame.to_dict("records")
+    fast = np.array([model.fast.predict_one(r) for r in rows])
+    one = np.array([model.predict_one(r) for r in rows])
+    np.testing.assert_allclose(fast, expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(one, expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(model.predict_rows(rows), expected, rtol=0, atol=1e-9)
+
+
+def test_fast_path_probe_rejects_swapped_columns(pipe, monkeypatch):
+    # 수치 컬럼 두 개의 출력 위치가 뒤바뀐 계획은 검증 입력에서 걸러져 None(=DataFrame 경로)
+    plan = fast_predict._plan_from_pipeline
+
+    def swapped(*args, **kwargs):
+        fast = plan(*args, **kwargs)
+        fast.numeric_idx = fast.numeric_idx[[1, 0] + list(range(2, len(fast.numeric_idx)))]
+        return fast
+
+    monkeypatch.setattr(fast_predict, "_plan_from_pipeline", swapped)
+    assert fast_predict.build_fast_predictor(pipe, MODEL_FEATURE_COLUMNS) is None
+
+
+def decision_path_reference(pipe, frame, owners, width):
+    """sklearn decision_path로 구한 경로별 노드 값 변화량을 입력 컬럼별로 합산 (트리 평균)"""
+    Xt = pipe[:-1].transform(frame)
+    Xt = np.asarray(Xt.toarray() if hasattr(Xt, "toarray") else Xt, dtype=np.float32)
+    forest = pipe.steps[-1][1]
+    contrib = np.zeros((len(frame), width))
+    bias = 0.0
+    for est in forest.estimators_:
+        tree = est.tree_
+        value = tree.value[:, 0, 0]
+        bias += value[0]
+        path = est.decision_path(Xt)
+        for i in range(len(frame)):
+            nodes = path.indices[path.indptr[i]:path.indptr[i + 1]]  # 부모 → 자식 순 (노드 번호 증가)
+            for parent, child in zip(nodes[:-1], nodes[1:]):
+                contrib[i, owners[tree.feature[parent]]] += value[child] - value[parent]
+    n = len(forest.estimators_)
+    return contrib / n, bias / n
+
+
+@pytest.mark.parametrize("engine", ["sklearn", "compiled"])
+def test_explainer_matches_decision_path_reference(pipe, frame, model_path, engine):
+    model = load_model(model_path, MODEL_FEATURE_COLUMNS, engine=engine, explain=True)
+    raw, contrib, bias = model.explain_frame(frame)
+    owners = model.fast.output_owners(MODEL_FEATURE_COLUMNS)
+    ref_contrib, ref_bias = decision_path_reference(pipe, frame, owners, contrib.shape[1])
+
+    np.testing.assert_allclose(raw, pipe.predict(frame), rtol=0, atol=1e-9)
+    assert bias == pytest.approx(ref_bias, abs=1e-9)
+    np.testing.assert_allclose(contrib, ref_contrib, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(bias + contrib.sum(axis=1), raw, rtol=0, atol=1e-9)
+
+    one_raw, one_contrib, _ = model.explain_one(frame.iloc[0].to_dict())
+    assert one_raw == pytest.approx(raw[0], abs=1e-9)
+    np.testing.assert_allclose(one_contrib, contrib[0], rtol=0, atol=1e-9)
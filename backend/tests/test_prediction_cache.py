@@ -0,0 +1,62 @@
+import prediction_cache
+from prediction_cache import PredictionCache, parse_quantization
+
+
+def make_cache(**kwargs) -> PredictionCache:
+    return PredictionCache(["a", "b"], **kwargs)
+
+
+def test_put_from_before_clear_is_dropped():
+    # 교체 전 모델로 계산을 시작한 요청이 clear() 뒤에 값을 넣어도 캐시에 남지 않아야 한다
+    cache = make_cache(max_size=8)
+    key = cache.make_key({"a": 1.0, "b": 2.0})
+    generation = cache.generation
+    cache.clear()
+    cache.put(key, 0.5, generation)
+    assert cache.get(key) is None
+
+    cache.put(key, 0.7, cache.generation)
+    assert cache.get(key) == 0.7
+    cache.put(key, 0.9)  # generation 생략 = 항상 저장
+    assert cache.get(key) == 0.9
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    cache = make_cache(max_size=8, ttl_seconds=5.0)
+    key = cache.make_key({"a": 1.0, "b": 2.0})
+    cache.put(key, 0.5)
+
+    now[0] = 104.9
+    assert cache.get(key) == 0.5
+    now[0] = 105.0
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = make_cache(max_size=2)
+    keys = [cache.make_key({"a": float(i), "b": 0.0}) for i in range(3)]
+    cache.put(keys[0], 0.0)
+    cache.put(keys[1], 1.0)
+    assert cache.get(keys[0]) == 0.0  # keys[0]을 최근 사용으로
+    cache.put(keys[2], 2.0)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 0.0 and cache.get(keys[2]) == 2.0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_quantized_keys_share_an_entry():
+    cache = make_cache(quantization=parse_quantization("a=0.5"))
+    assert cache.make_key({"a": 1.1, "b": 3.0}) == cache.make_key({"a": 0.9, "b": 3.0})
+    assert cache.make_key({"a": 1.1, "b": 3.0}) != cache.make_key({"a": 1.1, "b": 3.1})
+
+
+def test_disabled_cache_stores_nothing():
+    cache = make_cache(max_size=0)
+    key = cache.make_key({"a": 1.0, "b": 2.0})
+    cache.put(key, 0.5)
+    assert not cache.enabled
+    assert cache.get(key) is None
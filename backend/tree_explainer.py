@@ -0,0 +1,76 @@
+"""
+트리 경로 기여도 설명 (/predict?explain=true)
+
+각 트리에서 루트 → 리프로 내려갈 때 노드 값의 변화량을 그 노드의 분기 feature에 더하면
+  예측값 = bias(루트 값 평균) + Σ feature별 기여도
+가 정확히 성립한다 (트리 평균이므로 포레스트 전체도 동일).
+모델 로드 시 노드마다 (왼쪽/오른쪽 자식으로 갈 때의 값 변화량, 분기 feature가 속한 입력 컬럼)을
+미리 계산해 두므로, 요청 시에는 CompiledForest와 같은 깊이 단위 순회 한 번이면 된다.
+원-핫 열의 기여도는 원래 범주 컬럼 하나로 합쳐진다.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from compiled_forest import ROW_CHUNK, CompiledForest
+
+
+class PathExplainer:
+    def __init__(self, forest: CompiledForest, owners: np.ndarray, input_columns: Sequence[str]):
+        """owners: 전처리 출력 열마다 입력 컬럼 번호 (해당 없음 = len(input_columns))"""
+        self.columns = list(input_columns)
+        self.forest = forest
+        n_in = len(self.columns)
+
+        node_ids = np.arange(len(forest.left))
+        is_leaf = forest.left == node_ids  # CompiledForest의 리프는 자기 자신을 가리킴
+        value = np.asarray(forest.value, dtype=float)
+        self.left_delta = np.where(is_leaf, 0.0, value[forest.left] - value)
+        self.right_delta = np.where(is_leaf, 0.0, value[forest.right] - value)
+        owners = np.asarray(owners, dtype=np.intp)
+        self.owner = np.where(is_leaf, n_in, owners[np.asarray(forest.feature)]).astype(np.intp)
+        self.bias = float(value[np.asarray(forest.roots)].mean())
+
+    def explain(self, Xt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        전처리된 입력 Xt (n_rows, n_outputs) → (예측값 (n_rows,), 기여도 (n_rows, 입력 컬럼 수 + 1)).
+        마지막 열은 입력 컬럼에 대응하지 않는 전처리 출력 열의 기여도(보통 0).
+        """
+        Xt = np.asarray(Xt)
+        if Xt.ndim == 1:
+            Xt = Xt[None, :]
+        n = Xt.shape[0]
+        width = len(self.columns) + 1
+        raw = np.empty(n, dtype=float)
+        contrib = np.empty((n, width), dtype=float)
+        for start in range(0, n, ROW_CHUNK):
+            stop = min(start + ROW_CHUNK, n)
+            raw[start:stop], contrib[start:stop] = self._explain_chunk(Xt[start:stop], width)
+        return raw, contrib
+
+    def _explain_chunk(self, Xt: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        f = self.forest
+        X = np.asarray(Xt, dtype=np.float32)  # sklearn 트리와 같은 분기 기준
+        n = X.shape[0]
+        rows = np.arange(n)[None, :]
+        slots = rows * width
+        idx = np.repeat(np.asarray(f.roots)[:, None], n, axis=1)
+        acc = np.zeros(n * width, dtype=float)
+        for _ in range(f.max_depth):
+            go_left = X[rows, f.feature[idx]] <= f.threshold[idx]
+            delta = np.where(go_left, self.left_delta[idx], self.right_delta[idx])
+            acc += np.bincount((slots + self.owner[idx]).ravel(), weights=delta.ravel(), minlength=n * width)
+            idx = np.where(go_left, f.left[idx], f.right[idx])
+        raw = f.value[idx].mean(axis=0)
+        return raw, acc.reshape(n, width) / f.n_trees
+
+
+def build_path_explainer(forest: Optional[CompiledForest], owners: Optional[np.ndarray],
+                         input_columns: Sequence[str]) -> Optional[PathExplainer]:
+    if forest is None or owners is None:
+        return None
+    try:
+        return PathExplainer(forest, owners, input_columns)
+    except Exception as e:
+        print(f"[WARN] Tree path explainer disabled: {e}")
+        return None